@@ -0,0 +1,103 @@
+import numpy as np
+import torch as th
+from sb3_contrib import MaskablePPO
+from stable_baselines3.common.preprocessing import maybe_transpose
+from stable_baselines3.common.utils import obs_as_tensor
+
+from snake_env_pool import SnakeEnvPool
+from compact_rollout_buffer import CompactMaskableRolloutBuffer
+
+# MaskablePPO that collects its rollouts from a SnakeEnvPool through send/recv. Each env has its own column of the
+# rollout buffer and fills it at its own pace: every batch from recv() is written at the next free row of its envs,
+# and those envs get their next actions right away. An env stops once its column is full, so envs only wait for each
+# other at the end of a rollout instead of on every step. With any other env it is a plain MaskablePPO.
+# callback.on_step() runs once per batch from recv(), with num_timesteps advanced by the batch size.
+def unwrap_vec_env(env):
+    while hasattr(env, "venv"): # VecTransposeImage and other VecEnvWrappers.
+        env = env.venv
+    return env
+
+class AsyncMaskablePPO(MaskablePPO):
+    def collect_rollouts(self, env, callback, rollout_buffer, n_rollout_steps, use_masking=True):
+        pool = unwrap_vec_env(env)
+        if not isinstance(pool, SnakeEnvPool):
+            return super().collect_rollouts(env, callback, rollout_buffer, n_rollout_steps, use_masking)
+        assert self._last_obs is not None, "No previous observation was provided"
+
+        self.policy.set_training_mode(False)
+        rollout_buffer.reset()
+        callback.on_rollout_start()
+
+        num_envs = pool.num_envs
+        last_obs = np.array(self._last_obs) # Policy layout (channel-first for images), one row per env.
+        last_episode_starts = np.array(self._last_episode_starts, dtype=bool)
+        positions = np.zeros(num_envs, dtype=np.int64) # Next free row of each env's column.
+        # The transition each env is playing, written to the buffer once its step comes back.
+        pending_actions = np.zeros(num_envs, dtype=np.int64)
+        pending_values = np.zeros(num_envs, dtype=np.float32)
+        pending_log_probs = np.zeros(num_envs, dtype=np.float32)
+        pending_masks = np.ones((num_envs, rollout_buffer.mask_dims), dtype=bool)
+
+        def act(env_ids):
+            action_masks = np.array(pool.action_masks()[env_ids]) if use_masking else None
+            with th.no_grad():
+                obs_tensor = obs_as_tensor(last_obs[env_ids], self.device)
+                actions, values, log_probs = self.policy(obs_tensor, action_masks=action_masks)
+            actions = actions.cpu().numpy()
+            pending_actions[env_ids] = actions
+            pending_values[env_ids] = values.cpu().numpy().flatten()
+            pending_log_probs[env_ids] = log_probs.cpu().numpy()
+            if use_masking:
+                pending_masks[env_ids] = action_masks
+            pool.send(actions, env_ids)
+
+        act(np.arange(num_envs))
+        while (positions < n_rollout_steps).any():
+            new_obs, rewards, dones, infos, env_ids = pool.recv()
+            new_obs = maybe_transpose(new_obs, self.observation_space)
+            self.num_timesteps += len(env_ids)
+
+            callback.update_locals(locals())
+            if callback.on_step() is False:
+                return False
+            self._update_info_buffer(infos, dones)
+
+            for i in np.flatnonzero(dones):
+                if infos[i].get("terminal_observation") is not None and infos[i].get("TimeLimit.truncated", False):
+                    terminal_obs = self.policy.obs_to_tensor(infos[i]["terminal_observation"])[0]
+                    with th.no_grad():
+                        terminal_value = self.policy.predict_values(terminal_obs)[0]
+                    rewards[i] += self.gamma * terminal_value
+
+            rows = positions[env_ids]
+            obs = last_obs[env_ids]
+            action_masks = pending_masks[env_ids]
+            if isinstance(rollout_buffer, CompactMaskableRolloutBuffer):
+                obs = rollout_buffer.compress_observations(obs)
+                action_masks = rollout_buffer.pack_action_masks(action_masks)
+            rollout_buffer.observations[rows, env_ids] = obs
+            rollout_buffer.actions[rows, env_ids] = pending_actions[env_ids].reshape(len(env_ids), -1)
+            rollout_buffer.rewards[rows, env_ids] = rewards
+            rollout_buffer.episode_starts[rows, env_ids] = last_episode_starts[env_ids]
+            rollout_buffer.values[rows, env_ids] = pending_values[env_ids]
+            rollout_buffer.log_probs[rows, env_ids] = pending_log_probs[env_ids]
+            rollout_buffer.action_masks[rows, env_ids] = action_masks
+            positions[env_ids] += 1
+
+            last_obs[env_ids] = new_obs
+            last_episode_starts[env_ids] = dones
+            unfinished = env_ids[positions[env_ids] < n_rollout_steps]
+            if len(unfinished) > 0:
+                act(unfinished)
+
+        # Every env stopped after exactly n_rollout_steps steps, so the buffer is full and nothing is in flight.
+        rollout_buffer.pos = rollout_buffer.buffer_size
+        rollout_buffer.full = True
+        self._last_obs = last_obs
+        self._last_episode_starts = last_episode_starts
+        with th.no_grad():
+            values = self.policy.predict_values(obs_as_tensor(last_obs, self.device))
+        rollout_buffer.compute_returns_and_advantage(last_values=values, dones=last_episode_starts)
+
+        callback.on_rollout_end()
+        return True
@@ -0,0 +1,148 @@
+import numpy as np
+
+from direction import DOWN, ROW_DELTA, COL_DELTA, OPPOSITE_ARRAY, flat_offsets
+
+class BatchSnakeGame:
+    # Steps num_boards independent SnakeGame boards at once with array operations.
+    # Cells are stored as flat indices (row * board_size + col).
+    def __init__(self, num_boards, seed=0, board_size=12):
+        self.num_boards = num_boards
+        self.board_size = board_size
+        self.grid_size = self.board_size ** 2
+
+        self.rng = np.random.default_rng(seed)
+
+        # Body ring buffers: the head lives at body[i, head[i]] and the following length[i] - 1 slots (mod grid_size) hold the rest of the snake up to the tail.
+        self.body = np.zeros((num_boards, self.grid_size), dtype=np.intp)
+        self.head = np.zeros(num_boards, dtype=np.intp)
+        self.length = np.zeros(num_boards, dtype=np.intp)
+        self.occupancy = np.zeros((num_boards, self.grid_size), dtype=bool)
+
+        self.direction = np.full(num_boards, DOWN, dtype=np.intp)
+        self.food = np.zeros(num_boards, dtype=np.intp)
+        self.score = np.zeros(num_boards, dtype=np.int64)
+
+        self._boards = np.arange(num_boards)
+        self._ring = np.arange(self.grid_size)
+        self._flat_offsets = np.array(flat_offsets(self.board_size), dtype=np.intp) # Cell offset of each direction.
+
+        # Same initial snake as SnakeGame.reset(), head first.
+        center = self.board_size // 2
+        self._initial_body = np.array([(center + i) * self.board_size + center for i in range(1, -2, -1)], dtype=np.intp)
+
+        self.reset()
+
+    def _as_board_ids(self, ids):
+        if ids is None:
+            return self._boards
+        ids = np.asarray(ids)
+        if ids.dtype == bool:
+            return np.flatnonzero(ids)
+        return ids.reshape(-1)
+
+    def reset(self, ids=None):
+        # Reset all boards, or only the boards selected by ids (indices or a boolean mask).
+        ids = self._as_board_ids(ids)
+        if len(ids) == 0:
+            return
+
+        init_size = len(self._initial_body)
+        self.occupancy[ids] = False
+        self.body[ids, :init_size] = self._initial_body
+        self.occupancy[ids[:, None], self._initial_body] = True
+        self.head[ids] = 0
+        self.length[ids] = init_size
+        self.direction[ids] = DOWN
+        self.score[ids] = 0
+        self._generate_food(ids)
+
+    def step(self, actions):
+        boards = self._boards
+        actions = np.asarray(actions, dtype=np.intp).reshape(-1)
+
+        # Update direction based on action. Reversing into the body and unknown actions keep the current direction.
+        turn = (actions >= 0) & (actions <= 3) & (actions != OPPOSITE_ARRAY[self.direction])
+        self.direction = np.where(turn, actions, self.direction)
+
+        # Move snake based on current direction.
+        head_cell = self.body[boards, self.head]
+        row = head_cell // self.board_size + ROW_DELTA[self.direction]
+        col = head_cell % self.board_size + COL_DELTA[self.direction]
+        in_bounds = (row >= 0) & (row < self.board_size) & (col >= 0) & (col < self.board_size)
+        cell = np.where(in_bounds, head_cell + self._flat_offsets[self.direction], 0)
+
+        # Check if snake eats food. Boards that did not eat pop their tail before the collision check, as in SnakeGame.step.
+        food_obtained = in_bounds & (cell == self.food)
+        self.score += food_obtained * 10
+        popped = ~food_obtained
+        tail = self.body[boards, (self.head + self.length - 1) % self.grid_size]
+        self.occupancy[boards[popped], tail[popped]] = False
+        self.length -= popped
+
+        # Check if snake collided with itself or the wall.
+        done = ~in_bounds | self.occupancy[boards, cell]
+
+        alive = ~done
+        alive_boards = boards[alive]
+        self.head[alive] = (self.head[alive] - 1) % self.grid_size
+        self.body[alive_boards, self.head[alive]] = cell[alive]
+        self.occupancy[alive_boards, cell[alive]] = True
+        self.length += alive
+
+        # Add new food after snake movement completes.
+        eaten = np.flatnonzero(food_obtained)
+        if len(eaten) > 0:
+            self._generate_food(eaten)
+
+        head_cell = self.body[boards, self.head]
+        prev_head_cell = self.body[boards, (self.head + 1) % self.grid_size]
+        info = {
+            "snake_size": self.length.copy(),
+            "snake_head_pos": np.stack(np.divmod(head_cell, self.board_size), axis=-1),
+            "prev_snake_head_pos": np.stack(np.divmod(prev_head_cell, self.board_size), axis=-1),
+            "food_pos": np.stack(np.divmod(self.food, self.board_size), axis=-1),
+            "food_obtained": food_obtained
+        }
+
+        return done, info
+
+    def _generate_food(self, ids):
+        # Draw one uniformly random free cell per board in ids, all boards in a single batch.
+        free = ~self.occupancy[ids]
+        num_free = self.grid_size - self.length[ids]
+        pick = (self.rng.random(len(ids)) * num_free).astype(np.intp) # Rank of the chosen cell among the free cells.
+        food = np.argmax(np.cumsum(free, axis=1) > pick[:, None], axis=1)
+        food[num_free == 0] = 0 # If the snake occupies the entire board, default to (0, 0) like SnakeGame.
+        self.food[ids] = food
+
+    def get_action_mask(self):
+        # (num_boards, 4) boolean mask of actions that neither reverse the snake nor end the game.
+        # The tail cell counts as free unless the move eats the food, because only then the tail is not popped.
+        boards = self._boards[:, None]
+        actions = np.arange(4)[None, :]
+        head_cell = self.body[self._boards, self.head][:, None]
+        row = head_cell // self.board_size + ROW_DELTA[actions]
+        col = head_cell % self.board_size + COL_DELTA[actions]
+        in_bounds = (row >= 0) & (row < self.board_size) & (col >= 0) & (col < self.board_size)
+        cell = np.where(in_bounds, head_cell + self._flat_offsets[actions], 0)
+
+        tail = self.body[self._boards, (self.head + self.length - 1) % self.grid_size][:, None]
+        tail_pops = (cell == tail) & (cell != self.food[:, None])
+        blocked = self.occupancy[boards, cell] & ~tail_pops
+
+        return in_bounds & ~blocked & (actions != OPPOSITE_ARRAY[self.direction][:, None])
+
+    # The state of the food random stream shared by all boards.
+    def get_rng_state(self):
+        return self.rng.bit_generator.state
+
+    def set_rng_state(self, state):
+        self.rng.bit_generator.state = state
+
+    def get_snake(self, i):
+        # List of (row, column) cells of board i from head to tail, in SnakeGame.snake format.
+        cells = self.body[i, (self.head[i] + self._ring[:self.length[i]]) % self.grid_size]
+        return [(int(c) // self.board_size, int(c) % self.board_size) for c in cells]
+
+    def get_food(self, i):
+        return (int(self.food[i]) // self.board_size, int(self.food[i]) % self.board_size)
@@ -0,0 +1,47 @@
+import torch
+from sb3_contrib import MaskablePPO
+
+from snake_game_vec_env_cnn import SnakeVecEnv
+from small_grid_cnn import SmallGridCNN
+from compact_rollout_buffer import use_compact_rollout_buffer
+from training_telemetry import PhaseTimer
+
+# Training cost of the two CNN setups of train_cnn.py: 84x84x3 images with NatureCNN against compact 4x12x12 planes
+# with SmallGridCNN, each with the stock float32 rollout buffer and with CompactMaskableRolloutBuffer. All use the
+# in-process SnakeVecEnv so that only the observation, the network and the buffer differ.
+# Reports seconds per rollout (collection incl. policy forward passes), seconds per update (n_epochs of minibatch
+# gradient steps) and the bytes held by the rollout buffer.
+NUM_ENV = 32
+N_STEPS = 512
+BATCH_SIZE = 512
+N_EPOCHS = 4
+NUM_ROLLOUTS = 3
+SEED = 0
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+def rollout_buffer_bytes(buffer):
+    return sum(value.nbytes for value in vars(buffer).values() if hasattr(value, "nbytes"))
+
+def measure(compact, compact_buffer):
+    env = SnakeVecEnv(NUM_ENV, seed=SEED, compact=compact)
+    policy_kwargs = dict(features_extractor_class=SmallGridCNN) if compact else None
+    model = MaskablePPO("CnnPolicy", env, device=DEVICE, n_steps=N_STEPS, batch_size=BATCH_SIZE, n_epochs=N_EPOCHS,
+                        seed=SEED, policy_kwargs=policy_kwargs)
+    if compact_buffer:
+        use_compact_rollout_buffer(model, cell_size=1 if compact else env.scale)
+    timer = PhaseTimer()
+    model.learn(total_timesteps=NUM_ROLLOUTS * N_STEPS * NUM_ENV, callback=timer)
+    env.close()
+
+    # The first rollout and update include warm-up, so only the later ones count.
+    rollout = min(timer.rollout_times[1:])
+    update = min(timer.update_times[1:])
+    return rollout, update, rollout_buffer_bytes(model.rollout_buffer), env.observation_space.shape
+
+if __name__ == "__main__":
+    print(f"{NUM_ENV} envs x {N_STEPS} steps per rollout, batch {BATCH_SIZE}, {N_EPOCHS} epochs, device {DEVICE}")
+    print(f"{'setup':>8} {'buffer':>8} {'obs shape':>12} {'rollout s':>10} {'update s':>9} {'buffer MB':>10}")
+    for name, compact in (("image", False), ("compact", True)):
+        for buffer_name, compact_buffer in (("float32", False), ("uint8", True)):
+            rollout, update, nbytes, shape = measure(compact, compact_buffer)
+            print(f"{name:>8} {buffer_name:>8} {str(shape):>12} {rollout:>10.2f} {update:>9.2f} {nbytes / 2 ** 20:>10.1f}")
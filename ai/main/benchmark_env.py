@@ -0,0 +1,170 @@
+import sys
+import json
+import time
+import functools
+import platform
+import subprocess
+
+import numpy as np
+
+from snake_game import SnakeGame
+from snake_game_custom_wrapper_cnn import SnakeEnv as CnnSnakeEnv
+from snake_game_custom_wrapper_mlp import SnakeEnv as MlpSnakeEnv
+from hamiltonian_agent import generate_hamiltonian_cycle, find_next_action
+
+# Throughput suite for the environment stack: steps per second and p50/p99 latency of one call, for every
+# configuration x board size x fill ratio below. Results go to a JSON file so that runs can be compared over time:
+#     python benchmark_env.py [output.json]
+# VEC_CONFIGS step NUM_VEC_ENVS CNN envs per call (the in-process SnakeVecEnv and SB3's SubprocVecEnv of SnakeEnvs)
+# with random valid actions from fresh games, so they run at fill 0.0 only; their latency is that of one step of all envs.
+BOARD_SIZES = [6, 12, 20, 40] # Must be even, for the Hamiltonian cycle.
+FILL_RATIOS = [0.0, 0.8] # Fraction of the board covered by the snake; 0.0 is the initial 3-cell snake.
+CONFIGS = ["game", "mask", "observation", "mlp", "cnn"]
+VEC_CONFIGS = ["vec", "subproc"]
+NUM_STEPS = 20000
+NUM_VEC_ENVS = 8
+NUM_VEC_STEPS = 2000 # Calls, each stepping all NUM_VEC_ENVS envs.
+SEED = 0
+OUTPUT_PATH = "benchmark_env.json"
+
+# Scripted policy: follow a Hamiltonian cycle, which never dies and fills the board deterministically for a given seed.
+class CyclePolicy:
+    def __init__(self, board_size):
+        cycle = generate_hamiltonian_cycle(board_size)
+        self.board_size = board_size
+        self.actions = [0] * board_size ** 2 # Action that moves from each cell to the next one on the cycle.
+        for i, (row, col) in enumerate(cycle):
+            self.actions[row * board_size + col] = find_next_action((row, col), cycle[(i + 1) % len(cycle)])
+
+    def __call__(self, game):
+        row, col = game.body[0]
+        return self.actions[row * self.board_size + col]
+
+# Snapshot of a seeded game with the snake grown to the given fill ratio.
+def fill_board(board_size, fill):
+    game = SnakeGame(seed=SEED, board_size=board_size)
+    policy = CyclePolicy(board_size)
+    target = max(len(game.body), int(fill * game.grid_size))
+    while len(game.body) < target:
+        game.step(policy(game))
+    return game.snapshot()
+
+# (call, game) for a configuration: call(action) is the timed operation, game the SnakeGame it plays on.
+# "mask" and "observation" time only get_action_mask / the CNN encoder; the move itself is played untimed.
+def make_config(name, board_size):
+    if name == "game":
+        game = SnakeGame(seed=SEED, board_size=board_size)
+        return game.step, game
+    if name == "mask":
+        game = SnakeGame(seed=SEED, board_size=board_size)
+        return lambda action: game.get_action_mask(), game
+    if name == "observation":
+        env = CnnSnakeEnv(seed=SEED, board_size=board_size, limit_step=False)
+        return lambda action: env._generate_observation(), env.game
+    if name == "mlp":
+        env = MlpSnakeEnv(seed=SEED, board_size=board_size, limit_step=False)
+        return env.step, env.game
+    if name == "cnn":
+        env = CnnSnakeEnv(seed=SEED, board_size=board_size, limit_step=False)
+        return env.step, env.game
+    raise ValueError(f"Unknown configuration: {name}")
+
+def run(name, board_size, state):
+    call, game = make_config(name, board_size)
+    policy = CyclePolicy(board_size)
+    timed_step = name in ("game", "mlp", "cnn")
+    max_size = len(state.body) + max(2, game.grid_size // 20) # Restore the snapshot once the snake grows 5% past the fill.
+
+    game.restore(state)
+    latencies = np.zeros(NUM_STEPS, dtype=np.int64)
+    for i in range(NUM_STEPS):
+        action = policy(game)
+        if not timed_step:
+            game.step(action)
+        start = time.perf_counter_ns()
+        call(action)
+        latencies[i] = time.perf_counter_ns() - start
+        if len(game.body) > max_size or len(game.body) == game.grid_size:
+            game.restore(state)
+
+    return {
+        "config": name,
+        "board_size": board_size,
+        "fill": len(state.body) / game.grid_size,
+        "snake_size": len(state.body),
+        "steps": NUM_STEPS,
+        "steps_per_sec": NUM_STEPS / (latencies.sum() / 1e9),
+        "p50_us": float(np.percentile(latencies, 50)) / 1e3,
+        "p99_us": float(np.percentile(latencies, 99)) / 1e3
+    }
+
+# (env, action_masks) for a vectorized configuration: action_masks() returns the masks of all envs, one row per env.
+def make_vec_config(name, board_size):
+    if name == "vec":
+        from snake_game_vec_env_cnn import SnakeVecEnv # Imported only here, like SB3 below, so the other configs run without it.
+        env = SnakeVecEnv(NUM_VEC_ENVS, seed=SEED, board_size=board_size, limit_step=False)
+        return env, env.action_masks
+    if name == "subproc":
+        from stable_baselines3.common.vec_env import SubprocVecEnv
+        env = SubprocVecEnv([functools.partial(CnnSnakeEnv, seed=SEED + i, board_size=board_size, limit_step=False) for i in range(NUM_VEC_ENVS)])
+        return env, lambda: np.concatenate(env.env_method("get_action_mask"))
+    raise ValueError(f"Unknown configuration: {name}")
+
+def run_vec(name, board_size):
+    env, action_masks = make_vec_config(name, board_size)
+    rng = np.random.default_rng(SEED)
+    env.reset()
+    latencies = np.zeros(NUM_VEC_STEPS, dtype=np.int64)
+    for i in range(NUM_VEC_STEPS):
+        actions = np.array([rng.choice(np.flatnonzero(mask)) if mask.any() else 0 for mask in action_masks()])
+        start = time.perf_counter_ns()
+        env.step(actions)
+        latencies[i] = time.perf_counter_ns() - start
+    env.close()
+
+    return {
+        "config": name,
+        "board_size": board_size,
+        "fill": 0.0,
+        "snake_size": 3,
+        "num_envs": NUM_VEC_ENVS,
+        "steps": NUM_VEC_STEPS * NUM_VEC_ENVS,
+        "steps_per_sec": NUM_VEC_STEPS * NUM_VEC_ENVS / (latencies.sum() / 1e9),
+        "p50_us": float(np.percentile(latencies, 50)) / 1e3,
+        "p99_us": float(np.percentile(latencies, 99)) / 1e3
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    output_path = sys.argv[1] if len(sys.argv) > 1 else OUTPUT_PATH
+
+    results = []
+    print(f"{'config':>12} {'board':>5} {'fill':>5} {'steps/s':>10} {'p50 us':>8} {'p99 us':>8}")
+    for board_size in BOARD_SIZES:
+        for fill in FILL_RATIOS:
+            state = fill_board(board_size, fill)
+            for name in CONFIGS + (VEC_CONFIGS if fill == 0.0 else []):
+                result = run(name, board_size, state) if name in CONFIGS else run_vec(name, board_size)
+                results.append(result)
+                print(f"{name:>12} {board_size:>5} {result['fill']:>5.2f} {result['steps_per_sec']:>10.0f} {result['p50_us']:>8.2f} {result['p99_us']:>8.2f}")
+
+    report = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "num_steps": NUM_STEPS,
+        "num_vec_steps": NUM_VEC_STEPS,
+        "seed": SEED,
+        "results": results
+    }
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
@@ -0,0 +1,67 @@
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+from snake_game_custom_wrapper_cnn import SnakeEnv
+
+# Micro-benchmark of SnakeEnv._generate_observation (CNN wrapper) against the previous encoder,
+# which built a 12x12 board, a linspace, a 3-channel stack and two np.repeat copies on every step.
+NUM_CALLS = 20000
+SNAKE_SIZES = [3, 36, 72, 115, 140]
+
+def legacy_observation(game):
+    obs = np.zeros((game.board_size, game.board_size), dtype=np.uint8)
+    obs[tuple(np.transpose(game.snake))] = np.linspace(200, 50, len(game.snake), dtype=np.uint8)
+    obs = np.stack((obs, obs, obs), axis=-1)
+    obs[tuple(game.snake[0])] = [0, 255, 0]
+    obs[tuple(game.snake[-1])] = [255, 0, 0]
+    obs[game.food] = [0, 0, 255]
+    obs = np.repeat(np.repeat(obs, 7, axis=0), 7, axis=1)
+    return obs
+
+# Lay a snake of the given size along a serpentine path so that it can be measured without playing up to it.
+def set_snake_size(game, size):
+    path = []
+    for row in range(game.board_size):
+        cols = range(game.board_size) if row % 2 == 0 else range(game.board_size - 1, -1, -1)
+        path.extend((row, col) for col in cols)
+    body = path[:size][::-1]
+
+    game.body = deque(body)
+    game.occupancy = bytearray(game.grid_size)
+    game.non_snake.copy_from(game.init_non_snake)
+    for cell in game.non_snake.cells[:]:
+        game.non_snake.remove(cell)
+    for row, col in path[size:]:
+        game.non_snake.add(row * game.board_size + col)
+    for row, col in body:
+        game.occupancy[row * game.board_size + col] = 1
+    game.food = path[-1] if size < game.grid_size else (0, 0)
+
+def measure(encode):
+    encode() # Warm up caches before measuring.
+    start = time.perf_counter()
+    for _ in range(NUM_CALLS):
+        encode()
+    usec = (time.perf_counter() - start) / NUM_CALLS * 1e6
+
+    # Peak memory traced during one call: the size of the temporaries it allocates.
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    encode()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return usec, peak
+
+if __name__ == "__main__":
+    env = SnakeEnv(seed=0)
+    print(f"{'size':>5} {'legacy us':>10} {'legacy KB':>10} {'new us':>8} {'new KB':>7} {'speedup':>8}")
+    for size in SNAKE_SIZES:
+        set_snake_size(env.game, size)
+        assert (legacy_observation(env.game) == env._generate_observation()).all()
+        legacy_usec, legacy_peak = measure(lambda: legacy_observation(env.game))
+        new_usec, new_peak = measure(env._generate_observation)
+        print(f"{size:>5} {legacy_usec:>10.2f} {legacy_peak / 1024:>10.1f} {new_usec:>8.2f} {new_peak / 1024:>7.1f} {legacy_usec / new_usec:>7.1f}x")
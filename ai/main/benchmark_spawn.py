@@ -0,0 +1,68 @@
+import time
+import multiprocessing
+
+from snake_game_custom_wrapper_cnn import SnakeEnv
+
+# Start-up cost of env worker processes like the SubprocVecEnv workers of train_cnn.py: wall time until all workers
+# have built and reset their SnakeEnv, and memory per worker (RSS, and USS = memory unique to the worker). "pygame"
+# imports pygame and its mixer in every worker first, which is what snake_game.py did at import time before drawing
+# moved to snake_renderer.py. The workers are plain multiprocessing processes started the way SubprocVecEnv starts
+# them (forkserver where available, else spawn), so the script runs without stable_baselines3.
+# Memory is read from /proc, so this script runs on Linux only.
+NUM_WORKERS = 32
+NUM_RUNS = 3
+
+def _worker(remote, seed, import_pygame):
+    if import_pygame:
+        import os
+        os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+        import pygame
+        from pygame import mixer
+    env = SnakeEnv(seed=seed)
+    env.reset()
+    remote.send("ready")
+    remote.recv() # Stay alive until the memory has been read.
+    remote.close()
+
+# (RSS, USS) of a process in bytes, from its /proc/<pid>/smaps_rollup.
+def memory_usage(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return fields["Rss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+def measure(import_pygame):
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(start_method)
+    start = time.perf_counter()
+    remotes = []
+    processes = []
+    for seed in range(NUM_WORKERS):
+        remote, work_remote = context.Pipe()
+        process = context.Process(target=_worker, args=(work_remote, seed, import_pygame), daemon=True)
+        process.start()
+        work_remote.close()
+        remotes.append(remote)
+        processes.append(process)
+    for remote in remotes:
+        remote.recv()
+    spawn_time = time.perf_counter() - start
+
+    memory = [memory_usage(process.pid) for process in processes]
+    for remote in remotes:
+        remote.send("close")
+    for process in processes:
+        process.join()
+    rss = sum(m[0] for m in memory) / len(memory) / 2 ** 20
+    uss = sum(m[1] for m in memory) / len(memory) / 2 ** 20
+    return spawn_time, rss, uss
+
+if __name__ == "__main__":
+    print(f"{NUM_WORKERS} workers, best of {NUM_RUNS} runs")
+    print(f"{'workers':>8} {'spawn s':>8} {'RSS MB':>8} {'USS MB':>8}")
+    for name, import_pygame in (("pygame", True), ("headless", False)):
+        spawn_time, rss, uss = min(measure(import_pygame) for _ in range(NUM_RUNS))
+        print(f"{name:>8} {spawn_time:>8.2f} {rss:>8.1f} {uss:>8.1f}")
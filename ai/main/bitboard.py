@@ -0,0 +1,55 @@
+# Bitboard view of a Snake board: bit (row * board_size + col) of one Python int is set where the snake is.
+# A 12x12 board fits in a 144-bit int, so collision and the four-way action mask come down to a few shifts and ANDs.
+
+_BIT_CHARS = bytes.maketrans(b"\x00\x01", b"01")
+
+class BitBoard:
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.grid_size = board_size ** 2
+        self.full = (1 << self.grid_size) - 1 # All cells of the board.
+
+        left_edge = 0
+        for row in range(board_size):
+            left_edge |= 1 << (row * board_size)
+        self.not_left_edge = self.full & ~left_edge # Cells that can move left.
+        self.not_right_edge = self.full & ~(left_edge << (board_size - 1)) # Cells that can move right.
+
+        self.bits = 0 # Body occupancy.
+
+    # Load the occupancy grid of SnakeGame (bytearray of 0/1 per flat cell).
+    def load(self, occupancy):
+        self.bits = int(occupancy[::-1].translate(_BIT_CHARS), 2)
+
+    def set(self, cell):
+        self.bits |= 1 << cell
+
+    def clear(self, cell):
+        self.bits &= ~(1 << cell)
+
+    def collides(self, cell):
+        return self.bits >> cell & 1
+
+    # Head bit moved by the actions 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN; 0 where the move leaves the board.
+    def moves(self, head):
+        head_bit = 1 << head
+        return (
+            head_bit >> self.board_size,
+            (head_bit & self.not_left_edge) >> 1,
+            (head_bit & self.not_right_edge) << 1,
+            (head_bit << self.board_size) & self.full
+        )
+
+    # Same rule as SnakeGame.get_action_mask: the tail is free unless the move eats the food.
+    def action_mask(self, head, tail, food, reverse_action):
+        food_bit = 1 << food
+        blocked = self.bits & ~(1 << tail)
+        mask = [False, False, False, False]
+        for action, move in enumerate(self.moves(head)):
+            if move and action != reverse_action:
+                mask[action] = not (move & (self.bits if move == food_bit else blocked))
+        return mask
+
+    # Hashable key of (occupancy, head, food, direction) packed into one int.
+    def key(self, head, food, direction):
+        return (((direction * self.grid_size + food) * self.grid_size + head) << self.grid_size) | self.bits
@@ -0,0 +1,99 @@
+import gym
+import numpy as np
+from sb3_contrib.common.maskable.buffers import MaskableRolloutBuffer, MaskableRolloutBufferSamples
+
+# MaskableRolloutBuffer that keeps observations in their own dtype (uint8 for SnakeEnv) instead of float32 and packs
+# the action masks into bits. With cell_size > 1 it also keeps a single pixel per cell_size x cell_size block of every
+# image: SnakeEnv images are the board scaled up 7 times, so (3, 84, 84) frames are stored as (3, 12, 12) without
+# losing anything. Minibatches from get() are expanded back to full-size float32 observations and float masks; the
+# policy still does the division by 255. For train_cnn.py this is about 1/196 of the observation memory of the
+# stock buffer.
+class CompactMaskableRolloutBuffer(MaskableRolloutBuffer):
+    def __init__(self, buffer_size, observation_space, action_space, device="auto", gae_lambda=1, gamma=0.99, n_envs=1, cell_size=1):
+        self.cell_size = cell_size # Side of the uniform pixel blocks of the (channel-first) image observations.
+        super().__init__(buffer_size, observation_space, action_space, device=device, gae_lambda=gae_lambda, gamma=gamma, n_envs=n_envs)
+
+    # Allocates the arrays of RolloutBuffer.reset() and MaskableRolloutBuffer.reset() itself, so that the full-size
+    # float32 observations of the base classes are never allocated, not even as untouched pages.
+    def reset(self):
+        if isinstance(self.action_space, gym.spaces.Discrete):
+            self.mask_dims = self.action_space.n
+        elif isinstance(self.action_space, gym.spaces.MultiDiscrete):
+            self.mask_dims = sum(self.action_space.nvec)
+        elif isinstance(self.action_space, gym.spaces.MultiBinary):
+            self.mask_dims = 2 * self.action_space.n # One mask per binary outcome.
+        else:
+            raise ValueError(f"Unsupported action space {type(self.action_space)}")
+
+        stored_shape = self.obs_shape
+        if self.cell_size > 1:
+            height, width = self.obs_shape[-2:]
+            if height % self.cell_size or width % self.cell_size:
+                raise ValueError(f"Observation shape {self.obs_shape} is not made of {self.cell_size}x{self.cell_size} blocks.")
+            stored_shape = self.obs_shape[:-2] + (height // self.cell_size, width // self.cell_size)
+        steps = (self.buffer_size, self.n_envs)
+        self.observations = np.zeros(steps + stored_shape, dtype=self.observation_space.dtype)
+        self.actions = np.zeros(steps + (self.action_dim,), dtype=np.float32)
+        self.rewards = np.zeros(steps, dtype=np.float32)
+        self.returns = np.zeros(steps, dtype=np.float32)
+        self.episode_starts = np.zeros(steps, dtype=np.float32)
+        self.values = np.zeros(steps, dtype=np.float32)
+        self.log_probs = np.zeros(steps, dtype=np.float32)
+        self.advantages = np.zeros(steps, dtype=np.float32)
+        self.action_masks = np.empty(steps + ((self.mask_dims + 7) // 8,), dtype=np.uint8)
+        self.action_masks[:] = self.pack_action_masks(np.ones(self.mask_dims, dtype=bool)) # All actions valid.
+        self.generator_ready = False
+        self.pos = 0
+        self.full = False
+
+    def compress_observations(self, obs):
+        obs = np.asarray(obs)
+        return obs[..., ::self.cell_size, ::self.cell_size] if self.cell_size > 1 else obs
+
+    def pack_action_masks(self, action_masks):
+        return np.packbits(np.asarray(action_masks, dtype=bool), axis=-1)
+
+    def add(self, obs, action, reward, episode_start, value, log_prob, action_masks=None):
+        if len(log_prob.shape) == 0:
+            log_prob = log_prob.reshape(-1, 1)
+        self.observations[self.pos] = self.compress_observations(obs)
+        self.actions[self.pos] = np.array(action).reshape((self.n_envs, self.action_dim))
+        self.rewards[self.pos] = np.array(reward)
+        self.episode_starts[self.pos] = np.array(episode_start)
+        self.values[self.pos] = value.clone().cpu().numpy().flatten()
+        self.log_probs[self.pos] = log_prob.clone().cpu().numpy()
+        if action_masks is not None:
+            self.action_masks[self.pos] = self.pack_action_masks(np.reshape(action_masks, (self.n_envs, self.mask_dims)))
+        self.pos += 1
+        if self.pos == self.buffer_size:
+            self.full = True
+
+    def _get_samples(self, batch_inds, env=None):
+        observations = self.observations[batch_inds]
+        if self.cell_size > 1:
+            observations = observations.repeat(self.cell_size, axis=-2).repeat(self.cell_size, axis=-1)
+        action_masks = np.unpackbits(self.action_masks[batch_inds], axis=-1, count=self.mask_dims)
+        data = (
+            observations.astype(np.float32),
+            self.actions[batch_inds],
+            self.values[batch_inds].flatten(),
+            self.log_probs[batch_inds].flatten(),
+            self.advantages[batch_inds].flatten(),
+            self.returns[batch_inds].flatten(),
+            action_masks.astype(np.float32)
+        )
+        return MaskableRolloutBufferSamples(*map(self.to_torch, data))
+
+# Swap the rollout buffer of a freshly built MaskablePPO (or AsyncMaskablePPO) for a CompactMaskableRolloutBuffer.
+def use_compact_rollout_buffer(model, cell_size=1):
+    model.rollout_buffer = CompactMaskableRolloutBuffer(
+        model.n_steps,
+        model.observation_space,
+        model.action_space,
+        model.device,
+        gamma=model.gamma,
+        gae_lambda=model.gae_lambda,
+        n_envs=model.n_envs,
+        cell_size=cell_size
+    )
+    return model
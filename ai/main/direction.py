@@ -0,0 +1,22 @@
+import numpy as np
+
+# Directions are the action codes of the environments: 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN.
+UP, LEFT, RIGHT, DOWN = 0, 1, 2, 3
+NAMES = ("UP", "LEFT", "RIGHT", "DOWN")
+
+# (row, column) offset of each direction.
+DELTAS = ((-1, 0), (0, -1), (0, 1), (1, 0))
+# Direction that turns the snake back onto itself, i.e. 3 - direction.
+OPPOSITE = (DOWN, RIGHT, LEFT, UP)
+# Direction of each (row, column) offset, e.g. to follow a precomputed path.
+DELTA_DIRECTION = {delta: direction for direction, delta in enumerate(DELTAS)}
+
+# The same tables as arrays, for indexing with arrays of directions (BatchSnakeGame).
+ROW_DELTA = np.array([row for row, _ in DELTAS], dtype=np.intp)
+COL_DELTA = np.array([col for _, col in DELTAS], dtype=np.intp)
+OPPOSITE_ARRAY = np.array(OPPOSITE, dtype=np.intp)
+
+# Offset of each direction in flat cell indices (row * board_size + col). Moves off the left or right edge
+# wrap to the next row, so check the column before using them.
+def flat_offsets(board_size):
+    return tuple(row * board_size + col for row, col in DELTAS)
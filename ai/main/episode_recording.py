@@ -0,0 +1,177 @@
+import random
+import struct
+from collections import namedtuple
+
+from snake_game import SnakeGame, SnakeState
+
+# Episodes are stored as the seed of their round plus the direction the snake moved in on every step, packed four
+# moves to a byte. SnakeGame is deterministic given its seed, so that is enough to rebuild every step: a 1000-step
+# episode takes about 260 bytes. Keyframes (SnakeGame snapshots every keyframe_interval steps) make seeking cheap and
+# are saved along: score, direction, food, the body and the order of the free-cell pool (it decides where food goes),
+# about grid_size + 13 bytes each. The random state is saved as the number of food draws since the seed, since every
+# draw is one rng.random() call; loading replays them.
+KEYFRAME_INTERVAL = 256
+FILE_MAGIC = b"SNKREC02"
+EPISODE_HEADER = struct.Struct("<QHIHH") # seed, board_size, num_steps, keyframe_interval, number of keyframes
+KEYFRAME_HEADER = struct.Struct("<IBHHI") # score, direction, food cell, body length, food draws; then the cells
+
+EpisodeRecording = namedtuple("EpisodeRecording", ["seed", "board_size", "num_steps", "moves", "keyframes", "keyframe_interval"])
+
+def get_move(moves, step):
+    return (moves[step >> 2] >> ((step & 3) * 2)) & 3
+
+# Records the moves of one SnakeGame. Call start(seed) right after game.reset(seed=seed) and record() after every step.
+class EpisodeRecorder:
+    def __init__(self, game, keyframe_interval=KEYFRAME_INTERVAL):
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.seed = None
+        self.num_steps = 0
+        self.moves = bytearray()
+        self.keyframes = []
+
+    def start(self, seed):
+        self.seed = seed
+        self.num_steps = 0
+        self.moves = bytearray()
+        self.keyframes = [self.game.snapshot()]
+
+    # The direction after the step is the move that was played: invalid and reversing actions keep the direction,
+    # so it always fits in two bits and replays the same way.
+    def record(self):
+        step = self.num_steps
+        if step & 3 == 0:
+            self.moves.append(0)
+        self.moves[-1] |= self.game.direction << ((step & 3) * 2)
+        self.num_steps += 1
+        if self.num_steps % self.keyframe_interval == 0:
+            self.keyframes.append(self.game.snapshot())
+
+    def finish(self):
+        return EpisodeRecording(self.seed, self.game.board_size, self.num_steps, bytes(self.moves), tuple(self.keyframes), self.keyframe_interval)
+
+# Rebuilds any step of a recording by playing its moves on a fresh SnakeGame; needs neither torch nor the policy.
+# seek() restores the nearest keyframe at or before the target and plays at most keyframe_interval - 1 moves from there.
+class EpisodeReplayer:
+    def __init__(self, recording, silent_mode=True):
+        self.recording = recording
+        self.keyframe_interval = recording.keyframe_interval
+        self.game = SnakeGame(seed=recording.seed, board_size=recording.board_size, silent_mode=silent_mode)
+        self.keyframes = recording.keyframes # One at step 0 and every keyframe_interval steps after it.
+        self.step_index = 0 # Number of moves played on self.game.
+
+    def __len__(self):
+        return self.recording.num_steps
+
+    def move(self, step):
+        return get_move(self.recording.moves, step)
+
+    # Play the next move. Returns (done, info) of SnakeGame.step.
+    def step(self):
+        if self.step_index >= self.recording.num_steps:
+            raise IndexError("The recording has no more moves.")
+        result = self.game.step(self.move(self.step_index))
+        self.step_index += 1
+        return result
+
+    # Put the game in the state after the first `step` moves.
+    def seek(self, step):
+        if not 0 <= step <= self.recording.num_steps:
+            raise IndexError(f"Step {step} is outside the recording (0 to {self.recording.num_steps}).")
+        keyframe = step // self.keyframe_interval
+        start = keyframe * self.keyframe_interval
+        if not start <= self.step_index <= step: # Playing on from the current position would not be shorter.
+            self.game.restore(self.keyframes[keyframe])
+            self.step_index = start
+        while self.step_index < step:
+            self.step()
+        return self.game
+
+# A keyframe as bytes: KEYFRAME_HEADER, then every cell of the board, one byte each up to 16x16 boards: the body from
+# head to tail followed by the free cells in pool order.
+def _pack_keyframe(state, board_size):
+    free_cells = state.free_cells
+    # One draw on reset and one for every food eaten, except when the snake has filled the board.
+    food_draws = 1 + state.score // 10 - (0 if free_cells else 1)
+    food_row, food_col = state.food
+    cells = [row * board_size + col for row, col in state.body] + list(free_cells)
+    return KEYFRAME_HEADER.pack(state.score, state.direction, food_row * board_size + food_col, len(state.body), food_draws) \
+        + struct.pack(f"<{len(cells)}{_cell_format(board_size)}", *cells)
+
+# Inverse of _pack_keyframe. rng is a random.Random of the episode seed, advanced by earlier keyframes of the episode.
+def _unpack_keyframe(data, offset, board_size, rng, rng_draws):
+    score, direction, food, body_length, food_draws = KEYFRAME_HEADER.unpack_from(data, offset)
+    offset += KEYFRAME_HEADER.size
+    grid_size = board_size ** 2
+    cells = struct.unpack_from(f"<{grid_size}{_cell_format(board_size)}", data, offset)
+    offset += struct.calcsize(f"<{grid_size}{_cell_format(board_size)}")
+    for _ in range(food_draws - rng_draws):
+        rng.random()
+
+    occupancy = bytearray(grid_size)
+    for cell in cells[:body_length]:
+        occupancy[cell] = 1
+    free_cells = cells[body_length:]
+    free_index = [-1] * grid_size
+    for position, cell in enumerate(free_cells):
+        free_index[cell] = position
+    body = tuple(divmod(cell, board_size) for cell in cells[:body_length])
+    state = SnakeState(body, bytes(occupancy), free_cells, tuple(free_index), direction, divmod(food, board_size), score, rng.getstate(), None)
+    return state, offset, food_draws
+
+def _cell_format(board_size):
+    return "B" if board_size ** 2 <= 256 else "H"
+
+# File of many recordings: a magic header, the episode count, then per episode its header, packed moves and keyframes.
+def save_recordings(path, recordings):
+    with open(path, "wb") as f:
+        f.write(FILE_MAGIC)
+        f.write(struct.pack("<I", len(recordings)))
+        for recording in recordings:
+            f.write(EPISODE_HEADER.pack(recording.seed, recording.board_size, recording.num_steps, recording.keyframe_interval, len(recording.keyframes)))
+            f.write(recording.moves)
+            for keyframe in recording.keyframes:
+                f.write(_pack_keyframe(keyframe, recording.board_size))
+
+def load_recordings(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(FILE_MAGIC)] != FILE_MAGIC:
+        raise ValueError(f"{path} is not a SnakeGame recording file.")
+    offset = len(FILE_MAGIC)
+    (count,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    recordings = []
+    for _ in range(count):
+        seed, board_size, num_steps, keyframe_interval, num_keyframes = EPISODE_HEADER.unpack_from(data, offset)
+        offset += EPISODE_HEADER.size
+        size = (num_steps + 3) // 4
+        moves = data[offset:offset + size]
+        offset += size
+
+        keyframes = []
+        rng = random.Random(seed)
+        rng_draws = 0
+        for _ in range(num_keyframes):
+            keyframe, offset, rng_draws = _unpack_keyframe(data, offset, board_size, rng, rng_draws)
+            keyframes.append(keyframe)
+        recordings.append(EpisodeRecording(seed, board_size, num_steps, moves, tuple(keyframes), keyframe_interval))
+    return recordings
+
+# Watch a recorded episode: python episode_recording.py <file> [episode] [start_step]
+if __name__ == "__main__":
+    import sys
+    import time
+
+    FRAME_DELAY = 0.05
+
+    recordings = load_recordings(sys.argv[1])
+    recording = recordings[int(sys.argv[2]) if len(sys.argv) > 2 else 0]
+    replayer = EpisodeReplayer(recording, silent_mode=False)
+    replayer.seek(int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    replayer.game.render()
+    while replayer.step_index < len(replayer):
+        replayer.step()
+        replayer.game.render()
+        time.sleep(FRAME_DELAY)
+    print(f"Episode of seed {recording.seed}: {len(replayer)} steps, score {replayer.game.score}")
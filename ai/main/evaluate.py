@@ -0,0 +1,133 @@
+import sys
+import time
+
+import numpy as np
+
+from snake_game_custom_wrapper_cnn import SnakeEnv as CnnSnakeEnv
+from snake_game_custom_wrapper_mlp import SnakeEnv as MlpSnakeEnv
+from episode_recording import EpisodeRecorder, save_recordings
+
+# Headless evaluation of a trained model: NUM_EPISODES episodes over the fixed seeds FIRST_SEED, FIRST_SEED + 1, ...,
+# NUM_PARALLEL of them in lockstep. Every tick stacks the observations and action masks of the running episodes into
+# one model.predict call; a finished episode hands its slot to the next seed, and slots retire once the seeds run out.
+#     python evaluate.py [cnn|mlp] [model_path]
+# A model_path ending in .npz is a policy exported by export_policy.py, evaluated with NumpyPolicy: no torch needed,
+# and actions are always deterministic.
+POLICY = "cnn"
+MODEL_PATHS = {
+    "cnn": "trained_models_cnn/ppo_snake_final",
+    "cnn_mps": "trained_models_cnn_mps/ppo_snake_final", # Default on machines with mps.
+    "mlp": "trained_models_mlp/ppo_snake_final"
+}
+NUM_EPISODES = 500
+NUM_PARALLEL = 64
+FIRST_SEED = 0
+DETERMINISTIC = False # Sample actions like test_cnn.py / test_mlp.py; True takes the most likely action.
+LIMIT_STEP = True # End episodes that go grid_size * 4 steps without food, so that a looping policy cannot stall the run.
+COMPACT_OBS = False # Must match the model (COMPACT_OBS in train_cnn.py).
+FRAME_STACK = 1 # Must match the model (FRAME_STACK in train_cnn.py / train_mlp.py).
+RECORD_PATH = None # e.g. "evaluation.rec": save every episode, to watch it again with episode_recording.py.
+
+def make_env(policy):
+    if policy == "cnn":
+        return CnnSnakeEnv(limit_step=LIMIT_STEP, compact=COMPACT_OBS, frame_stack=FRAME_STACK)
+    if policy == "mlp":
+        return MlpSnakeEnv(limit_step=LIMIT_STEP, frame_stack=FRAME_STACK)
+    raise ValueError(f"Unknown policy: {policy}")
+
+# MaskablePPO or NumpyPolicy; torch and SB3 are imported only for MaskablePPO models.
+def load_model(path):
+    if path.endswith(".npz"):
+        from numpy_policy import NumpyPolicy
+        return NumpyPolicy.load(path)
+    from sb3_contrib import MaskablePPO
+    return MaskablePPO.load(path)
+
+def default_model_path(policy):
+    if policy == "cnn":
+        import torch
+        if torch.backends.mps.is_available():
+            return MODEL_PATHS["cnn_mps"]
+    return MODEL_PATHS[policy]
+
+# model: anything with MaskablePPO's predict(obs, action_masks=..., deterministic=...), e.g. a NumpyPolicy.
+def evaluate(model, policy):
+    num_parallel = min(NUM_PARALLEL, NUM_EPISODES)
+    envs = [make_env(policy) for _ in range(num_parallel)]
+    recorders = [EpisodeRecorder(env.game) for env in envs] if RECORD_PATH else None
+    obs_batch = np.zeros((num_parallel,) + envs[0].observation_space.shape, dtype=envs[0].observation_space.dtype)
+    mask_batch = np.zeros((num_parallel, 4), dtype=bool)
+
+    scores = np.zeros(NUM_EPISODES, dtype=np.int64)
+    steps = np.zeros(NUM_EPISODES, dtype=np.int64)
+    wins = np.zeros(NUM_EPISODES, dtype=bool)
+    recordings = [None] * NUM_EPISODES
+    episode_of_slot = [None] * num_parallel
+    num_started = 0
+
+    # Start the next seed in a slot, or retire the slot when all episodes have been started.
+    def start(slot):
+        nonlocal num_started
+        if num_started == NUM_EPISODES:
+            episode_of_slot[slot] = None
+            return
+        episode = num_started
+        num_started += 1
+        episode_of_slot[slot] = episode
+        obs_batch[slot] = envs[slot].reset(seed=FIRST_SEED + episode)
+        mask_batch[slot] = envs[slot].get_action_mask()[0]
+        if recorders is not None:
+            recorders[slot].start(FIRST_SEED + episode)
+
+    for slot in range(num_parallel):
+        start(slot)
+
+    start_time = time.perf_counter()
+    active = list(range(num_parallel))
+    while active:
+        if len(active) == num_parallel:
+            actions, _ = model.predict(obs_batch, action_masks=mask_batch, deterministic=DETERMINISTIC)
+        else: # Only the slots still running.
+            actions, _ = model.predict(obs_batch[active], action_masks=mask_batch[active], deterministic=DETERMINISTIC)
+
+        for slot, action in zip(active, actions):
+            env = envs[slot]
+            obs, _, done, info = env.step(action)
+            if recorders is not None:
+                recorders[slot].record()
+            episode = episode_of_slot[slot]
+            steps[episode] += 1
+            if done:
+                scores[episode] = env.game.score
+                wins[episode] = info["snake_size"] == env.game.grid_size
+                if recorders is not None:
+                    recordings[episode] = recorders[slot].finish()
+                start(slot)
+            else:
+                obs_batch[slot] = obs
+                mask_batch[slot] = info["action_mask"]
+        active = [slot for slot in active if episode_of_slot[slot] is not None]
+    wall_time = time.perf_counter() - start_time
+
+    if RECORD_PATH:
+        save_recordings(RECORD_PATH, recordings)
+    return scores, steps, wins, wall_time
+
+def report(scores, steps, wins, wall_time):
+    print(f"=================== {len(scores)} episodes, seeds {FIRST_SEED} to {FIRST_SEED + len(scores) - 1} ==================")
+    print(f"Score: mean {scores.mean():.1f}, std {scores.std():.1f}, min {scores.min()}, max {scores.max()}")
+    percentiles = np.percentile(scores, [10, 25, 50, 75, 90])
+    print("Score percentiles: " + ", ".join(f"p{p} {value:.0f}" for p, value in zip([10, 25, 50, 75, 90], percentiles)))
+    print(f"Win rate: {wins.mean() * 100:.1f}% ({wins.sum()} / {len(wins)})")
+    if wins.any():
+        win_steps = steps[wins]
+        print(f"Steps to win: mean {win_steps.mean():.0f}, median {np.median(win_steps):.0f}, min {win_steps.min()}, max {win_steps.max()}")
+    print(f"Wall time: {wall_time:.1f} s ({len(scores) / wall_time:.2f} episodes/s, {steps.sum() / wall_time:.0f} steps/s)")
+
+if __name__ == "__main__":
+    policy = sys.argv[1] if len(sys.argv) > 1 else POLICY
+    model_path = sys.argv[2] if len(sys.argv) > 2 else default_model_path(policy)
+    model = load_model(model_path)
+    report(*evaluate(model, policy))
+    if RECORD_PATH:
+        print(f"Episodes saved to {RECORD_PATH}")
@@ -0,0 +1,85 @@
+import sys
+import json
+
+import numpy as np
+import torch
+from torch import nn
+from sb3_contrib import MaskablePPO
+from stable_baselines3.common.preprocessing import is_image_space
+
+from numpy_policy import NumpyPolicy
+
+# Export the actor of a trained MaskablePPO model to an .npz file for numpy_policy.NumpyPolicy, then check on random
+# observations and masks that both pick the same actions:
+#     python export_policy.py <model.zip> [output.npz]
+NUM_CHECKS = 256
+
+# Leaf modules of the actor in the order they run: features extractor, policy part of the MLP extractor, action head.
+def actor_modules(policy):
+    modules = []
+    for part in (policy.features_extractor, policy.mlp_extractor.policy_net, policy.action_net):
+        modules.extend(module for module in part.modules() if len(list(module.children())) == 0)
+    return modules
+
+def export_layers(policy):
+    layers = []
+    arrays = {}
+    for module in actor_modules(policy):
+        index = len(layers)
+        if isinstance(module, nn.Conv2d):
+            if module.dilation != (1, 1) or module.groups != 1 or module.stride[0] != module.stride[1] or module.padding[0] != module.padding[1]:
+                raise ValueError(f"Unsupported convolution: {module}")
+            layers.append({"type": "conv", "stride": module.stride[0], "padding": module.padding[0]})
+        elif isinstance(module, nn.Linear):
+            layers.append({"type": "linear"})
+        elif isinstance(module, nn.ReLU):
+            layers.append({"type": "relu"})
+        elif isinstance(module, nn.Tanh):
+            layers.append({"type": "tanh"})
+        elif isinstance(module, nn.Flatten):
+            layers.append({"type": "flatten"})
+        else:
+            raise ValueError(f"Unsupported layer: {module}")
+        if isinstance(module, (nn.Conv2d, nn.Linear)):
+            arrays[f"layer{index}_weight"] = module.weight.detach().cpu().numpy().astype(np.float32)
+            arrays[f"layer{index}_bias"] = module.bias.detach().cpu().numpy().astype(np.float32)
+    return layers, arrays
+
+def export(model, path):
+    policy = model.policy
+    observation_space = model.observation_space # As seen by the policy, i.e. channel-first for images.
+    layers, arrays = export_layers(policy)
+    spec = {
+        "layers": layers,
+        "observation_shape": list(observation_space.shape),
+        "image": bool(is_image_space(observation_space, check_channels=False) and policy.normalize_images)
+    }
+    np.savez(path, spec=np.array(json.dumps(spec)), **arrays)
+
+# Fraction of random observations and masks on which NumpyPolicy picks the same action as the torch policy, and the
+# largest difference between their logits.
+def check(model, path, num_checks=NUM_CHECKS):
+    numpy_policy = NumpyPolicy.load(path)
+    observation_space = model.observation_space
+    obs = np.stack([observation_space.sample() for _ in range(num_checks)])
+    rng = np.random.default_rng(0)
+    masks = rng.random((num_checks, 4)) < 0.75
+    masks[np.arange(num_checks), rng.integers(0, 4, num_checks)] = True # At least one valid action.
+
+    with torch.no_grad():
+        obs_tensor, _ = model.policy.obs_to_tensor(obs)
+        features = model.policy.extract_features(obs_tensor)
+        torch_logits = model.policy.action_net(model.policy.mlp_extractor.forward_actor(features)).cpu().numpy()
+    torch_actions, _ = model.predict(obs, action_masks=masks, deterministic=True)
+    numpy_actions, _ = numpy_policy.predict(obs, action_masks=masks)
+    max_diff = np.abs(numpy_policy.logits(obs) - torch_logits).max()
+    return (torch_actions == numpy_actions).mean(), max_diff
+
+if __name__ == "__main__":
+    model_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else model_path.rsplit(".zip", 1)[0] + ".npz"
+    model = MaskablePPO.load(model_path, device="cpu")
+    export(model, output_path)
+    agreement, max_diff = check(model, output_path)
+    print(f"Policy written to {output_path}")
+    print(f"Same action on {agreement * 100:.1f}% of {NUM_CHECKS} random observations, max logit difference {max_diff:.2e}")
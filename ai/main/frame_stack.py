@@ -0,0 +1,68 @@
+import numpy as np
+
+# The last num_frames frames of one env, or of num_envs envs stepped in lockstep, oldest first, readable without a copy.
+# Frames live in a ring of 3 * num_frames slots that is stored twice in a row: every write goes into both copies of its
+# slot, so the newest num_frames frames are always one contiguous slice. The current and the previous stacked
+# observation span at most 2 * num_frames slots (after a reset they are disjoint), and neither push() nor reset() writes
+# into them: SB3 still holds the previous one as _last_obs, and vec envs keep the current one as the terminal
+# observation while they reset. Both stay intact until the next push() or reset() after that.
+# Channel-first image frames (C, H, W) stack to (num_frames * C, H, W); other frames gain a leading frame axis.
+class FrameStack:
+    def __init__(self, num_frames, frame_shape, dtype, num_envs=None):
+        frame_shape = tuple(frame_shape)
+        self.num_frames = num_frames
+        self.num_slots = 3 * num_frames
+        self.batch_shape = () if num_envs is None else (num_envs,)
+        self.frames = np.zeros(self.batch_shape + (2 * self.num_slots,) + frame_shape, dtype=dtype)
+        if len(frame_shape) == 3:
+            self.stacked_shape = (num_frames * frame_shape[0],) + frame_shape[1:]
+            # SB3 takes the smallest axis of an image for its channels and transposes channel-last looking ones.
+            if self.stacked_shape[0] > min(frame_shape[1:]):
+                raise ValueError(f"{num_frames} stacked {frame_shape} frames give {self.stacked_shape}, which SB3 "
+                                 f"reads as channel-last; stack at most {min(frame_shape[1:]) // frame_shape[0]} frames.")
+        else:
+            self.stacked_shape = (num_frames,) + frame_shape
+        self.slot = 0 # Ring slot of the newest frame.
+
+    # Append the newest frame (of every env) and return the stacked observation.
+    def push(self, frame):
+        self.slot = (self.slot + 1) % self.num_slots
+        self._write(self.slot, frame)
+        return self.stacked()
+
+    # Start a new episode: the frame becomes the newest one and the older ones are zero, as in VecFrameStack.
+    # ids selects the envs to reset in the batched case, right after push(); the other envs keep their frames, which
+    # are copied along (num_frames frames per env, on steps that end an episode only). Either way the stacked
+    # observation moves to the num_frames slots after the current one, so the returned view shares no memory with the
+    # current or the previous stacked observation.
+    def reset(self, frame, ids=None):
+        frames = self._ordered_frames().copy()
+        if self.batch_shape:
+            frames = frames.swapaxes(0, 1) # Frame axis first.
+        if ids is None:
+            frames[:-1] = 0
+            frames[-1] = frame
+        else:
+            frames[:-1, ids] = 0
+            frames[-1, ids] = frame
+        self.slot = (self.slot + self.num_frames) % self.num_slots
+        for offset in range(self.num_frames):
+            self._write(self.slot - offset, frames[self.num_frames - 1 - offset])
+        return self.stacked()
+
+    def stacked(self):
+        return self._ordered_frames().reshape(self.batch_shape + self.stacked_shape)
+
+    # View of the newest num_frames frames, oldest first: it ends on the second copy of the newest slot.
+    def _ordered_frames(self):
+        start = self.slot + self.num_slots - self.num_frames + 1
+        index = (slice(None),) * len(self.batch_shape) + (slice(start, start + self.num_frames),)
+        return self.frames[index]
+
+    def _write(self, slot, frame):
+        slot %= self.num_slots
+        for index in (slot, slot + self.num_slots):
+            if self.batch_shape:
+                self.frames[:, index] = frame
+            else:
+                self.frames[index] = frame
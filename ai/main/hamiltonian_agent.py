@@ -2,6 +2,7 @@ import time
 import random
 
 from snake_game_custom_wrapper_cnn import SnakeEnv
+from direction import DELTA_DIRECTION
 
 FRAME_DELAY = 0.01 # 0.01 fast, 0.05 slow
 ROUND_DELAY = 5
@@ -25,19 +26,8 @@ def generate_hamiltonian_cycle(board_size):
     return path
 
 def find_next_action(snake_head, next_position):
-    row_diff = next_position[0] - snake_head[0]
-    col_diff = next_position[1] - snake_head[1]
-
-    if row_diff == 1 and col_diff == 0:
-        return 3  # DOWN
-    elif row_diff == -1 and col_diff == 0:
-        return 0  # UP
-    elif row_diff == 0 and col_diff == 1:
-        return 2  # RIGHT
-    elif row_diff == 0 and col_diff == -1:
-        return 1  # LEFT
-    else:
-        return -1
+    delta = (next_position[0] - snake_head[0], next_position[1] - snake_head[1])
+    return DELTA_DIRECTION.get(delta, -1) # -1 if the cells are not adjacent.
 
 def main():
     seed = random.randint(0, 1e9)
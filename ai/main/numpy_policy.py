@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Torch-free runtime for MaskablePPO policies exported by export_policy.py: the actor network (features extractor,
+# policy MLP and action head) as a list of conv/linear/activation layers in an .npz file, evaluated with NumPy only.
+# predict() takes the masked argmax of the action logits, i.e. model.predict(..., deterministic=True).
+
+def conv2d(x, weight, bias, stride, padding):
+    if padding:
+        x = np.pad(x, ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+    kernel_h, kernel_w = weight.shape[2:]
+    windows = sliding_window_view(x, (kernel_h, kernel_w), axis=(2, 3))[:, :, ::stride, ::stride] # (N, C, H_out, W_out, kh, kw)
+    out = np.tensordot(windows, weight, axes=([1, 4, 5], [1, 2, 3])) # (N, H_out, W_out, C_out)
+    out += bias
+    return out.transpose(0, 3, 1, 2)
+
+def relu(x):
+    return np.maximum(x, 0, out=x)
+
+class NumpyPolicy:
+    def __init__(self, layers, observation_shape, image):
+        self.layers = layers # Dicts with "type" and, for conv/linear, "weight", "bias" (and "stride", "padding").
+        self.observation_shape = tuple(observation_shape) # Shape of one observation as the network takes it (CxHxW for images).
+        self.image = image # uint8 image observations are divided by 255, as SB3 does.
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            spec = json.loads(str(data["spec"]))
+            layers = []
+            for i, layer in enumerate(spec["layers"]):
+                if layer["type"] in ("conv", "linear"):
+                    layer["weight"] = data[f"layer{i}_weight"]
+                    layer["bias"] = data[f"layer{i}_bias"]
+                layers.append(layer)
+        return cls(layers, spec["observation_shape"], spec["image"])
+
+    # Action logits for a batch of observations (or a single one, which gets a batch of one).
+    def logits(self, obs):
+        x = np.asarray(obs)
+        single = x.ndim == len(self.observation_shape)
+        if single:
+            x = x[None]
+        x = x.astype(np.float32)
+        if self.image:
+            if x.shape[1:] != self.observation_shape: # HxWxC image, which SB3 transposes with VecTransposeImage.
+                x = x.transpose(0, 3, 1, 2)
+            x /= 255.0
+
+        for layer in self.layers:
+            kind = layer["type"]
+            if kind == "conv":
+                x = conv2d(x, layer["weight"], layer["bias"], layer["stride"], layer["padding"])
+            elif kind == "linear":
+                x = x @ layer["weight"].T + layer["bias"]
+            elif kind == "relu":
+                x = relu(x)
+            elif kind == "tanh":
+                x = np.tanh(x)
+            elif kind == "flatten":
+                x = x.reshape(len(x), -1)
+            else:
+                raise ValueError(f"Unknown layer type: {kind}")
+        return x[0] if single else x
+
+    # Same call as MaskablePPO.predict; always deterministic. Invalid actions get -inf logits before the argmax.
+    def predict(self, obs, action_masks=None, deterministic=True):
+        logits = self.logits(obs)
+        if action_masks is not None:
+            logits = np.where(np.reshape(action_masks, logits.shape), logits, -np.inf)
+        return np.argmax(logits, axis=-1), None
@@ -0,0 +1,29 @@
+import torch
+from torch import nn
+from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
+
+# Feature extractor for the compact (planes, board_size, board_size) observations of SnakeEnv(compact=True).
+# NatureCNN's 8x8 stride-4 first layer is sized for 84x84 images; on a 12x12 board every cell matters, so this
+# network keeps full resolution with padded 3x3 convolutions and only then flattens into a linear layer.
+class SmallGridCNN(BaseFeaturesExtractor):
+    def __init__(self, observation_space, features_dim=256, channels=64):
+        super().__init__(observation_space, features_dim)
+        n_input_channels = observation_space.shape[0]
+        self.cnn = nn.Sequential(
+            nn.Conv2d(n_input_channels, channels // 2, kernel_size=3, padding=1),
+            nn.ReLU(),
+            nn.Conv2d(channels // 2, channels, kernel_size=3, padding=1),
+            nn.ReLU(),
+            nn.Conv2d(channels, channels, kernel_size=3, padding=1),
+            nn.ReLU(),
+            nn.Flatten(),
+        )
+
+        # Compute shape by doing one forward pass
+        with torch.no_grad():
+            n_flatten = self.cnn(torch.as_tensor(observation_space.sample()[None]).float()).shape[1]
+
+        self.linear = nn.Sequential(nn.Linear(n_flatten, features_dim), nn.ReLU())
+
+    def forward(self, observations):
+        return self.linear(self.cnn(observations))
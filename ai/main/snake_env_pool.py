@@ -0,0 +1,64 @@
+from collections import deque
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from snake_game_shm_vec_env import SharedMemoryVecEnv
+
+# Asynchronous pool of SnakeEnvs in the style of envpool: send(actions, env_ids) hands actions to some envs and returns
+# at once, recv() returns the first batch_size envs that have finished their step, from whichever workers are done
+# first. Finished episodes reset automatically, as in SB3 (the final observation is in info["terminal_observation"]).
+# Still a SharedMemoryVecEnv, so step()/reset() work synchronously on all envs, but do not mix the two while envs
+# are in flight. AsyncMaskablePPO (async_maskable_ppo.py) collects rollouts through send/recv.
+class SnakeEnvPool(SharedMemoryVecEnv):
+    ASYNC_SLOT = 0 # Half of the double-buffered shared arrays written by send(); recv() copies out of it.
+
+    def __init__(self, env_fns, batch_size=None, start_method=None, num_workers=None, pin_cpus=False):
+        super().__init__(env_fns, start_method=start_method, num_workers=num_workers, pin_cpus=pin_cpus)
+        self.batch_size = batch_size if batch_size is not None else max(1, self.num_envs // 2)
+        self._in_flight = [0] * len(self.remotes) # Envs stepping in each worker.
+        self._ready = deque() # (env_id, info) of finished steps not yet returned by recv().
+
+    # Start one step of each env in env_ids (all envs by default) with the matching action.
+    def send(self, actions, env_ids=None):
+        if env_ids is None:
+            env_ids = range(self.num_envs)
+        steps = {}
+        for env_id, action in zip(env_ids, actions):
+            worker, local_id = self.env_locations[env_id]
+            steps.setdefault(worker, []).append((local_id, int(action)))
+        for worker, worker_steps in steps.items():
+            self.remotes[worker].send(("step_some", (self.ASYNC_SLOT, worker_steps)))
+            self._in_flight[worker] += len(worker_steps)
+
+    # (obs, rewards, dones, infos, env_ids) of the first batch_size envs to finish their step, or of all envs in flight
+    # if there are fewer. The arrays are copies; the action masks of these envs are action_masks()[env_ids].
+    def recv(self):
+        target = min(self.batch_size, len(self._ready) + sum(self._in_flight))
+        if target == 0:
+            raise RuntimeError("recv() called with no env in flight; send() actions first.")
+        while len(self._ready) < target:
+            busy = [self.remotes[worker] for worker, count in enumerate(self._in_flight) if count > 0]
+            for remote in wait(busy):
+                results = remote.recv()
+                self._in_flight[self.remotes.index(remote)] -= len(results)
+                self._ready.extend(results)
+
+        env_ids = np.empty(target, dtype=np.int64)
+        infos = []
+        for i in range(target):
+            env_ids[i], info = self._ready.popleft()
+            infos.append(info)
+        arrays = self._arrays
+        dones = arrays["dones"][self.ASYNC_SLOT, env_ids]
+        for i in np.flatnonzero(dones):
+            infos[i]["terminal_observation"] = arrays["terminal_obs"][self.ASYNC_SLOT, env_ids[i]].copy()
+        return arrays["obs"][self.ASYNC_SLOT, env_ids], arrays["rewards"][self.ASYNC_SLOT, env_ids], dones, infos, env_ids
+
+    def close(self):
+        # Collect the steps still in flight, so that the workers can take the close command.
+        for worker, count in enumerate(self._in_flight):
+            while count > 0:
+                count -= len(self.remotes[worker].recv())
+            self._in_flight[worker] = 0
+        super().close()
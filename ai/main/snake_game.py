@@ -1,266 +1,368 @@
-import os
-import sys
 import random
+from collections import deque, namedtuple
 
 import numpy as np
 
-os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-import pygame
-from pygame import mixer
+from bitboard import BitBoard
+from direction import DOWN, DELTAS, OPPOSITE, flat_offsets
+from zobrist import zobrist_keys
+
+# Result of SnakeGame.step with plain ints; positions are (row, column) tuples.
+StepInfo = namedtuple("StepInfo", ["snake_size", "snake_head_pos", "prev_snake_head_pos", "food_pos", "food_obtained"])
+
+# The info dict SnakeGame.step used to return, with positions as np.array.
+def legacy_info_dict(info):
+    return {
+        "snake_size": info.snake_size,
+        "snake_head_pos": np.array(info.snake_head_pos),
+        "prev_snake_head_pos": np.array(info.prev_snake_head_pos),
+        "food_pos": np.array(info.food_pos),
+        "food_obtained": info.food_obtained
+    }
+
+# State captured by SnakeGame.snapshot(). body is the tuple of (row, column) cells from head to tail, occupancy the packed
+# occupancy grid, free_cells and free_index the free-cell pool (its order decides where the next food goes).
+# zobrist_hash is None unless the game keeps a Zobrist hash.
+SnakeState = namedtuple("SnakeState", ["body", "occupancy", "free_cells", "free_index", "direction", "food", "score", "rng_state", "zobrist_hash"])
+
+class FreeCellPool:
+    # Free board cells (flat index row * board_size + col) kept in a dense list plus a position index.
+    # Insert appends, delete swaps the last cell into the hole, so add, remove and random choice are all O(1).
+    def __init__(self, grid_size):
+        self.cells = []
+        self.index = [-1] * grid_size # Position of each cell in self.cells, -1 if the cell is not free.
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.index[cell] >= 0
+
+    def add(self, cell):
+        self.index[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def remove(self, cell):
+        pos = self.index[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[pos] = last
+            self.index[last] = pos
+        self.index[cell] = -1
+        return pos
+
+    # Inverse of remove(cell) that returned pos: put cell back at pos and move the cell found there to the end.
+    def insert(self, cell, pos):
+        if pos == len(self.cells):
+            self.add(cell)
+            return
+        moved = self.cells[pos]
+        self.index[moved] = len(self.cells)
+        self.cells.append(moved)
+        self.cells[pos] = cell
+        self.index[cell] = pos
+
+    def choice(self, rng):
+        return self.cells[int(rng.random() * len(self.cells))]
+
+    def copy_from(self, other):
+        self.cells = other.cells[:]
+        self.index = other.index[:]
 
 class SnakeGame:
-    def __init__(self, seed=0, board_size=12, silent_mode=True):
+    def __init__(self, seed=0, board_size=12, silent_mode=True, legacy_info=False, bitboard=False, zobrist=False):
         self.board_size = board_size
         self.grid_size = self.board_size ** 2
-        self.cell_size = 40
-        self.width = self.height = self.board_size * self.cell_size
 
-        self.border_size = 20
-        self.display_width = self.width + 2 * self.border_size
-        self.display_height = self.height + 2 * self.border_size + 40
+        self.legacy_info = legacy_info # Return the old info dict from step() instead of a StepInfo.
 
         self.silent_mode = silent_mode
         if not silent_mode:
-            pygame.init()
-            pygame.display.set_caption("Snake Game")
-            self.screen = pygame.display.set_mode((self.display_width, self.display_height))
-            self.font = pygame.font.Font(None, 36)
-
-            # Load sound effects
-            mixer.init()
-            self.sound_eat = mixer.Sound("sound/eat.wav")
-            self.sound_game_over = mixer.Sound("sound/game_over.wav")
-            self.sound_victory = mixer.Sound("sound/victory.wav")
+            from snake_renderer import SnakeRenderer # Imported only here, so that headless games never load pygame.
+            self.renderer = SnakeRenderer(self)
         else:
-            self.screen = None
-            self.font = None
-
-        self.snake = None
-        self.non_snake = None
+            self.renderer = None
+
+        self.body = None # Snake cells from head to tail, deque of (row, column).
+        self.occupancy = None # bytearray over flat cells, 1 where the snake is.
+        self.bitboard = BitBoard(self.board_size) if bitboard else None # Optional bitboard mirror of the occupancy grid.
+        self.zobrist = zobrist_keys(self.board_size) if zobrist else None
+        self.zobrist_hash = None # 64-bit hash of (head, body cells, food, direction), updated on every move if zobrist is enabled.
+        self.non_snake = FreeCellPool(self.grid_size)
+        self.undo_stack = [] # One record per push(), consumed by pop().
+
+        self.cells = [(row, col) for row in range(self.board_size) for col in range(self.board_size)] # Flat index to (row, column).
+        self.flat_offsets = flat_offsets(self.board_size) # Flat index offset of each direction.
+        self.init_snake = [(self.board_size // 2 + i, self.board_size // 2) for i in range(1, -2, -1)] # Initialize the snake with three cells in (row, column) format.
+        self.init_non_snake = FreeCellPool(self.grid_size) # Free cells at the start of every round, copied on reset.
+        for row, col in self.cells:
+            if (row, col) not in self.init_snake:
+                self.init_non_snake.add(row * self.board_size + col)
+        self.init_occupancy = bytes(0 if cell in self.init_non_snake else 1 for cell in range(self.grid_size))
 
         self.direction = None
         self.score = 0
         self.food = None
         self.seed_value = seed
 
-        random.seed(seed) # Set random seed.
-        
+        self.rng = random.Random(seed) # Each game owns its random stream, so games sharing a process do not disturb each other.
+        self._rng_state = None # Cached self.rng.getstate(), dropped whenever food is drawn.
+
         self.reset()
 
-    def reset(self):
-        self.snake = [(self.board_size // 2 + i, self.board_size // 2) for i in range(1, -2, -1)] # Initialize the snake with three cells in (row, column) format.
-        self.non_snake = set([(row, col) for row in range(self.board_size) for col in range(self.board_size) if (row, col) not in self.snake]) # Initialize the non-snake cells.
-        self.direction = "DOWN" # Snake starts downward in each round
+    def reset(self, seed=None):
+        if seed is not None: # Restart the random stream, e.g. to replay the round of a given seed.
+            self.seed_value = seed
+            self.rng.seed(seed)
+            self._rng_state = None
+
+        self.body = deque(self.init_snake)
+        self.occupancy = bytearray(self.init_occupancy)
+        if self.bitboard is not None:
+            self.bitboard.load(self.occupancy)
+        self.non_snake.copy_from(self.init_non_snake) # Initialize the non-snake cells.
+        self.direction = DOWN # Snake starts downward in each round
         self.food = self._generate_food()
         self.score = 0
+        self.undo_stack.clear()
+        if self.zobrist is not None:
+            self.zobrist_hash = self.compute_zobrist_hash()
+
+    # List view of the snake cells from head to tail, built on demand.
+    @property
+    def snake(self):
+        return list(self.body)
 
     def step(self, action):
+        done, food_obtained, _, _, _ = self._move(action)
+
+        if not self.silent_mode:
+            if food_obtained:
+                self.renderer.sound_eat.play()
+            if done: # If game is over and the game is not in silent mode, play game over sound effect.
+                if len(self.body) < self.grid_size:
+                    self.renderer.sound_game_over.play()
+                else:
+                    self.renderer.sound_victory.play()
+
+        info = StepInfo(len(self.body), self.body[0], self.body[1], self.food, food_obtained)
+        if self.legacy_info:
+            info = legacy_info_dict(info)
+
+        return done, info
+
+    # Play one move. Besides done and food_obtained, returns what push() needs to undo it: the popped tail cell,
+    # the free-pool position the new head was taken from, and the random state before the new food was drawn (if save_rng).
+    def _move(self, action, save_rng=False):
+        prev_direction = self.direction
+        prev_food = self.food
         self._update_direction(action) # Update direction based on action.
 
         # Move snake based on current action.
-        row, col = self.snake[0]
-        if self.direction == "UP":
-            row -= 1
-        elif self.direction == "DOWN":
-            row += 1
-        elif self.direction == "LEFT":
-            col -= 1
-        elif self.direction == "RIGHT":
-            col += 1
+        row, col = self.body[0]
+        prev_head = row * self.board_size + col
+        row_delta, col_delta = DELTAS[self.direction]
+        row += row_delta
+        col += col_delta
 
         # Check if snake eats food.
+        tail = None
         if (row, col) == self.food: # If snake eats food, it won't pop the last cell. The food grid will be taken by snake later, no need to update board vacancy matrix.
             food_obtained = True
             self.score += 10 # Add 10 points to the score when food is eaten.
-            if not self.silent_mode:
-                self.sound_eat.play()
         else:
             food_obtained = False
-            self.non_snake.add(self.snake.pop()) # Pop the last cell of the snake and add it to the non-snake set.
+            tail_row, tail_col = self.body.pop() # Pop the last cell of the snake and add it to the non-snake cells.
+            tail = tail_row * self.board_size + tail_col
+            self.occupancy[tail] = 0
+            self.non_snake.add(tail)
+            if self.bitboard is not None:
+                self.bitboard.clear(tail)
 
         # Check if snake collided with itself or the wall
         done = (
-            (row, col) in self.snake
-            or row < 0
+            row < 0
             or row >= self.board_size
             or col < 0
             or col >= self.board_size
+            or (self.bitboard.collides(row * self.board_size + col) if self.bitboard is not None else self.occupancy[row * self.board_size + col])
         )
 
+        head_pos = None
         if not done:
-            self.snake.insert(0, (row, col))
-            self.non_snake.remove((row, col))
-
-        else: # If game is over and the game is not in silent mode, play game over sound effect.
-            if not self.silent_mode:
-                if len(self.snake) < self.grid_size:
-                    self.sound_game_over.play()
-                else:
-                    self.sound_victory.play()
+            cell = row * self.board_size + col
+            self.body.appendleft(self.cells[cell])
+            self.occupancy[cell] = 1
+            head_pos = self.non_snake.remove(cell)
+            if self.bitboard is not None:
+                self.bitboard.set(cell)
 
         # Add new food after snake movement completes.
+        rng_state = None
         if food_obtained:
+            if save_rng:
+                rng_state = self.get_rng_state()
             self.food = self._generate_food()
 
-        info ={
-            "snake_size": len(self.snake),
-            "snake_head_pos": np.array(self.snake[0]),
-            "prev_snake_head_pos": np.array(self.snake[1]),
-            "food_pos": np.array(self.food),
-            "food_obtained": food_obtained
-        }
+        # Update the Zobrist hash with the parts that changed.
+        if self.zobrist is not None:
+            keys = self.zobrist
+            value = self.zobrist_hash
+            if tail is not None:
+                value ^= keys.body[tail]
+            if not done:
+                value ^= keys.body[cell] ^ keys.head[prev_head] ^ keys.head[cell]
+            if food_obtained:
+                value ^= keys.food[prev_food[0] * self.board_size + prev_food[1]] ^ keys.food[self.food[0] * self.board_size + self.food[1]]
+            if self.direction != prev_direction:
+                value ^= keys.direction[prev_direction] ^ keys.direction[self.direction]
+            self.zobrist_hash = value
+
+        return done, food_obtained, tail, head_pos, rng_state
+
+    # Play one move that pop() can take back in O(1). Returns done.
+    def push(self, action):
+        direction, food, score, zobrist_hash = self.direction, self.food, self.score, self.zobrist_hash
+        done, _, tail, head_pos, rng_state = self._move(action, save_rng=True)
+        self.undo_stack.append((direction, food, score, zobrist_hash, done, tail, head_pos, rng_state))
+        return done
+
+    # Take back the last push(), restoring the free-cell order as well so that later food draws repeat exactly.
+    def pop(self):
+        direction, food, score, zobrist_hash, done, tail, head_pos, rng_state = self.undo_stack.pop()
+        if not done:
+            row, col = self.body.popleft()
+            cell = row * self.board_size + col
+            self.occupancy[cell] = 0
+            self.non_snake.insert(cell, head_pos)
+            if self.bitboard is not None:
+                self.bitboard.clear(cell)
+        if tail is not None:
+            self.body.append(self.cells[tail])
+            self.occupancy[tail] = 1
+            self.non_snake.remove(tail) # The tail is the last free cell again, so this just drops it.
+            if self.bitboard is not None:
+                self.bitboard.set(tail)
+        if rng_state is not None:
+            self.set_rng_state(rng_state)
+        self.direction = direction
+        self.food = food
+        self.score = score
+        self.zobrist_hash = zobrist_hash
+
+    # Immutable copy of the game state. Every field is a flat copy (cells are shared, not duplicated), so both
+    # snapshot() and restore() run at C speed.
+    def snapshot(self):
+        return SnakeState(
+            tuple(self.body),
+            bytes(self.occupancy),
+            tuple(self.non_snake.cells),
+            tuple(self.non_snake.index),
+            self.direction,
+            self.food,
+            self.score,
+            self.get_rng_state(),
+            self.zobrist_hash
+        )
 
-        return done, info
+    # Load a state returned by snapshot(). A state without rng_state leaves the random stream untouched.
+    def restore(self, state):
+        self.body = deque(state.body)
+        self.occupancy = bytearray(state.occupancy)
+        if self.bitboard is not None:
+            self.bitboard.load(self.occupancy)
+        self.non_snake.cells = list(state.free_cells)
+        self.non_snake.index = list(state.free_index)
+        self.direction = state.direction
+        self.food = state.food
+        self.score = state.score
+        if self.zobrist is not None:
+            self.zobrist_hash = state.zobrist_hash if state.zobrist_hash is not None else self.compute_zobrist_hash()
+        if state.rng_state is not None and state.rng_state is not self._rng_state: # Skip when the stream is already in that state.
+            self.set_rng_state(state.rng_state)
+        self.undo_stack.clear()
+
+    # Validity of the four actions: an action is invalid if it reverses the snake or ends the game.
+    # The tail cell counts as free unless the move eats the food, because only then the tail is not popped.
+    def get_action_mask(self):
+        head_row, head_col = self.body[0]
+        tail_row, tail_col = self.body[-1]
+        tail = tail_row * self.board_size + tail_col
+        reverse_action = OPPOSITE[self.direction]
+        if self.bitboard is not None:
+            food_row, food_col = self.food
+            return self.bitboard.action_mask(head_row * self.board_size + head_col, tail, food_row * self.board_size + food_col, reverse_action)
+
+        head = head_row * self.board_size + head_col
+        mask = [False, False, False, False]
+        for action, (row_delta, col_delta) in enumerate(DELTAS):
+            row = head_row + row_delta
+            col = head_col + col_delta
+            if action == reverse_action or row < 0 or row >= self.board_size or col < 0 or col >= self.board_size:
+                continue
+            cell = head + self.flat_offsets[action]
+            mask[action] = not self.occupancy[cell] or (cell == tail and (row, col) != self.food)
+        return mask
+
+    # Zobrist hash of the current position from scratch; zobrist_hash holds the same value, kept up to date move by move.
+    def compute_zobrist_hash(self):
+        head_row, head_col = self.body[0]
+        food_row, food_col = self.food
+        return self.zobrist.hash(
+            (row * self.board_size + col for row, col in self.body),
+            head_row * self.board_size + head_col,
+            food_row * self.board_size + food_col,
+            self.direction
+        )
 
-    # 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN
+    # Hashable key of the position (occupied cells, head, food, direction). Needs the bitboard backend.
+    def state_key(self):
+        head_row, head_col = self.body[0]
+        food_row, food_col = self.food
+        return self.bitboard.key(head_row * self.board_size + head_col, food_row * self.board_size + food_col, self.direction)
+
+    # 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN. Reversing onto the body and unknown actions keep the current direction.
     def _update_direction(self, action):
-        if action == 0:
-            if self.direction != "DOWN":
-                self.direction = "UP"
-        elif action == 1:
-            if self.direction != "RIGHT":
-                self.direction = "LEFT"
-        elif action == 2:
-            if self.direction != "LEFT":
-                self.direction = "RIGHT"
-        elif action == 3:
-            if self.direction != "UP":
-                self.direction = "DOWN"
-        # Swich Case is supported in Python 3.10+
+        if 0 <= action <= 3 and action != OPPOSITE[self.direction]:
+            self.direction = int(action) # Actions from model.predict are NumPy scalars.
 
     def _generate_food(self):
         if len(self.non_snake) > 0:
-            food = random.sample(self.non_snake, 1)[0]
+            food = self.cells[self.non_snake.choice(self.rng)]
+            self._rng_state = None
         else: # If the snake occupies the entire board, no need to generate new food and just default to (0, 0).
             food = (0, 0)
         return food
     
-    def draw_score(self):
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (self.border_size, self.height + 2 * self.border_size))
-    
-    def draw_welcome_screen(self):
-        title_text = self.font.render("SNAKE GAME", True, (255, 255, 255))
-        start_button_text = "START"
-
-        self.screen.fill((0, 0, 0))
-        self.screen.blit(title_text, (self.display_width // 2 - title_text.get_width() // 2, self.display_height // 4))
-        self.draw_button_text(start_button_text, (self.display_width // 2, self.display_height // 2))
-        pygame.display.flip()
-
-    def draw_game_over_screen(self):
-        game_over_text = self.font.render("GAME OVER", True, (255, 255, 255))
-        final_score_text = self.font.render(f"SCORE: {self.score}", True, (255, 255, 255))
-        retry_button_text = "RETRY"
-
-        self.screen.fill((0, 0, 0))
-        self.screen.blit(game_over_text, (self.display_width // 2 - game_over_text.get_width() // 2, self.display_height // 4))
-        self.screen.blit(final_score_text, (self.display_width // 2 - final_score_text.get_width() // 2, self.display_height // 4 + final_score_text.get_height() + 10))
-        self.draw_button_text(retry_button_text, (self.display_width // 2, self.display_height // 2))          
-        pygame.display.flip()
-
-    def draw_button_text(self, button_text_str, pos, hover_color=(255, 255, 255), normal_color=(100, 100, 100)):
-        mouse_pos = pygame.mouse.get_pos()
-        button_text = self.font.render(button_text_str, True, normal_color)
-        text_rect = button_text.get_rect(center=pos)
-        
-        if text_rect.collidepoint(mouse_pos):
-            colored_text = self.font.render(button_text_str, True, hover_color)
-        else:
-            colored_text = self.font.render(button_text_str, True, normal_color)
-        
-        self.screen.blit(colored_text, text_rect)
-    
-    def draw_countdown(self, number):
-        countdown_text = self.font.render(str(number), True, (255, 255, 255))
-        self.screen.blit(countdown_text, (self.display_width // 2 - countdown_text.get_width() // 2, self.display_height // 2 - countdown_text.get_height() // 2))
-        pygame.display.flip()
-
-    def is_mouse_on_button(self, button_text):
-        mouse_pos = pygame.mouse.get_pos()
-        text_rect = button_text.get_rect(
-            center=(
-                self.display_width // 2,
-                self.display_height // 2,
-            )
-        )
-        return text_rect.collidepoint(mouse_pos)
-
-    def render(self):
-        self.screen.fill((0, 0, 0))
-
-        # Draw border
-        pygame.draw.rect(self.screen, (255, 255, 255), (self.border_size - 2, self.border_size - 2, self.width + 4, self.height + 4), 2)
-
-        # Draw snake
-        self.draw_snake()
-        
-        # Draw food
-        if len(self.snake) < self.grid_size: # If the snake occupies the entire board, don't draw food.
-            r, c = self.food
-            pygame.draw.rect(self.screen, (255, 0, 0), (c * self.cell_size + self.border_size, r * self.cell_size + self.border_size, self.cell_size, self.cell_size))
-
-        # Draw score
-        self.draw_score()
+    # The state of the random stream, e.g. to checkpoint a game in the middle of a round.
+    # Cached between food draws, since snapshots during search mostly ask for the same state again.
+    def get_rng_state(self):
+        if self._rng_state is None:
+            self._rng_state = self.rng.getstate()
+        return self._rng_state
 
-        pygame.display.flip()
+    def set_rng_state(self, state):
+        self.rng.setstate(state)
+        self._rng_state = state
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-    def draw_snake(self):
-        # Draw the head
-        head_r, head_c = self.snake[0]
-        head_x = head_c * self.cell_size + self.border_size
-        head_y = head_r * self.cell_size + self.border_size
-
-        # Draw the head (Blue)
-        pygame.draw.polygon(self.screen, (100, 100, 255), [
-            (head_x + self.cell_size // 2, head_y),
-            (head_x + self.cell_size, head_y + self.cell_size // 2),
-            (head_x + self.cell_size // 2, head_y + self.cell_size),
-            (head_x, head_y + self.cell_size // 2)
-        ])
-
-        eye_size = 3
-        eye_offset = self.cell_size // 4
-        pygame.draw.circle(self.screen, (255, 255, 255), (head_x + eye_offset, head_y + eye_offset), eye_size)
-        pygame.draw.circle(self.screen, (255, 255, 255), (head_x + self.cell_size - eye_offset, head_y + eye_offset), eye_size)
-
-        # Draw the body (color gradient)
-        color_list = np.linspace(255, 100, len(self.snake), dtype=np.uint8)
-        i = 1
-        for r, c in self.snake[1:]:
-            body_x = c * self.cell_size + self.border_size
-            body_y = r * self.cell_size + self.border_size
-            body_width = self.cell_size
-            body_height = self.cell_size
-            body_radius = 5
-            pygame.draw.rect(self.screen, (0, color_list[i], 0),
-                            (body_x, body_y, body_width, body_height), border_radius=body_radius)
-            i += 1
-        pygame.draw.rect(self.screen, (255, 100, 100),
-                            (body_x, body_y, body_width, body_height), border_radius=body_radius)
-        
+    def render(self):
+        self.renderer.render()
 
 if __name__ == "__main__":
+    import sys
     import time
 
+    from snake_renderer import pygame
+
     seed = random.randint(0, 1e9)
     game = SnakeGame(seed=seed, silent_mode=False)
-    pygame.init()
-    game.screen = pygame.display.set_mode((game.display_width, game.display_height))
-    pygame.display.set_caption("Snake Game")
-    game.font = pygame.font.Font(None, 36)
-    
+    renderer = game.renderer
 
     game_state = "welcome"
 
     # Two hidden button for start and retry click detection
-    start_button = game.font.render("START", True, (0, 0, 0))
-    retry_button = game.font.render("RETRY", True, (0, 0, 0))
+    start_button = renderer.font.render("START", True, (0, 0, 0))
+    retry_button = renderer.font.render("RETRY", True, (0, 0, 0))
 
     update_interval = 0.15
     start_time = time.time()
@@ -286,36 +388,36 @@ if __name__ == "__main__":
                 sys.exit()
 
             if game_state == "welcome" and event.type == pygame.MOUSEBUTTONDOWN:
-                if game.is_mouse_on_button(start_button):
+                if renderer.is_mouse_on_button(start_button):
                     for i in range(3, 0, -1):
-                        game.screen.fill((0, 0, 0))
-                        game.draw_countdown(i)
-                        game.sound_eat.play()
+                        renderer.screen.fill((0, 0, 0))
+                        renderer.draw_countdown(i)
+                        renderer.sound_eat.play()
                         pygame.time.wait(1000)
                     action = -1  # Reset action variable when starting a new game
                     game_state = "running"
 
             if game_state == "game_over" and event.type == pygame.MOUSEBUTTONDOWN:
-                if game.is_mouse_on_button(retry_button):
+                if renderer.is_mouse_on_button(retry_button):
                     for i in range(3, 0, -1):
-                        game.screen.fill((0, 0, 0))
-                        game.draw_countdown(i)
-                        game.sound_eat.play()
+                        renderer.screen.fill((0, 0, 0))
+                        renderer.draw_countdown(i)
+                        renderer.sound_eat.play()
                         pygame.time.wait(1000)
                     game.reset()
                     action = -1  # Reset action variable when starting a new game
                     game_state = "running"
         
         if game_state == "welcome":
-            game.draw_welcome_screen()
+            renderer.draw_welcome_screen()
 
         if game_state == "game_over":
-            game.draw_game_over_screen()
+            renderer.draw_game_over_screen()
 
         if game_state == "running":
             if time.time() - start_time >= update_interval:
                 done, _ = game.step(action)
-                game.render()
+                renderer.render()
                 start_time = time.time()
 
                 if done:
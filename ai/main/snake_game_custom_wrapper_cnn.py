@@ -1,25 +1,62 @@
 import math
+import functools
 
 import gym
 import numpy as np
 
-from snake_game import SnakeGame
+from snake_game import SnakeGame, legacy_info_dict
+from frame_stack import FrameStack
+
+# Planes of the compact observation.
+BODY_PLANE, HEAD_PLANE, TAIL_PLANE, FOOD_PLANE = range(4)
+NUM_PLANES = 4
+
+# Row L holds np.linspace(200, 50, L, dtype=np.uint8) padded to grid_size: the gray level of every body cell, head to tail, of a snake of length L.
+@functools.lru_cache(maxsize=None)
+def body_intensity_table(grid_size):
+    table = np.zeros((grid_size + 1, grid_size), dtype=np.uint8)
+    for length in range(1, grid_size + 1):
+        table[length, :length] = np.linspace(200, 50, length, dtype=np.uint8)
+    table.flags.writeable = False
+    return table
+
+@functools.lru_cache(maxsize=None)
+def _body_intensity_bytes(grid_size):
+    return [row.tobytes() for row in body_intensity_table(grid_size)]
 
 class SnakeEnv(gym.Env):
-    def __init__(self, seed=0, board_size=12, silent_mode=True, limit_step=True):
+    def __init__(self, seed=0, board_size=12, silent_mode=True, limit_step=True, legacy_info=False, compact=False, frame_stack=1):
         super().__init__()
         self.game = SnakeGame(seed=seed, board_size=board_size, silent_mode=silent_mode)
         self.game.reset()
 
         self.silent_mode = silent_mode
+        self.legacy_info = legacy_info # Return info dicts with np.array positions, as SnakeGame used to.
+        self.compact = compact # Observe the raw board as (4, board_size, board_size) planes instead of an upscaled RGB image.
 
         self.action_space = gym.spaces.Discrete(4) # 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN
         
-        self.observation_space = gym.spaces.Box(
-            low=0, high=255,
-            shape=(84, 84, 3),
-            dtype=np.uint8
-        )
+        self.scale = 7 # Each board cell becomes a 7x7 pixel block (84x84 for a 12x12 board).
+        if compact:
+            self.observation_space = gym.spaces.Box(
+                low=0, high=255,
+                shape=(NUM_PLANES, board_size, board_size),
+                dtype=np.uint8
+            ) # Channel-first planes: body gray levels, head, tail, food.
+        else:
+            self.observation_space = gym.spaces.Box(
+                low=0, high=255,
+                shape=(board_size * self.scale, board_size * self.scale, 3),
+                dtype=np.uint8
+            )
+
+        # Observe the last frame_stack frames, oldest first. Stacked images are channel-first: (3 * frame_stack, 84, 84).
+        if frame_stack > 1:
+            frame_shape = self.observation_space.shape if compact else (3,) + self.observation_space.shape[:2]
+            self._frames = FrameStack(frame_stack, frame_shape, np.uint8)
+            self.observation_space = gym.spaces.Box(low=0, high=255, shape=self._frames.stacked_shape, dtype=np.uint8)
+        else:
+            self._frames = None
 
         self.board_size = board_size
         self.grid_size = board_size ** 2 # Max length of snake is board_size^2
@@ -33,29 +70,52 @@ class SnakeEnv(gym.Env):
         else:
             self.step_limit = 1e9 # Basically no limit.
         self.reward_step_counter = 0
-
-    def reset(self):
-        self.game.reset()
+        self._action_mask = np.array([self.game.get_action_mask()])
+
+        # Preallocated observation buffers, rewritten in place on every step.
+        self._body_intensity = _body_intensity_bytes(self.grid_size)
+        self._gray = bytearray(self.grid_size)
+        self._empty_gray = bytes(self.grid_size)
+        self._gray_board = np.frombuffer(self._gray, dtype=np.uint8).reshape(board_size, board_size, 1)
+        self._board_obs = np.zeros((board_size, board_size, 3), dtype=np.uint8)
+        self._obs = np.zeros((board_size * self.scale, board_size * self.scale, 3), dtype=np.uint8)
+        self._obs_rows = self._obs.reshape(board_size, self.scale, board_size * self.scale, 3) # Pixel rows grouped by board row.
+        self._wide_rows = np.zeros((board_size, board_size * self.scale, 3), dtype=np.uint8) # One widened pixel row per board row.
+        self._wide_cells = self._wide_rows.reshape(board_size, board_size, self.scale, 3)
+        self._planes = np.zeros((NUM_PLANES, board_size, board_size), dtype=np.uint8)
+
+    # A seed restarts the game's random stream, so that the round can be replayed from the seed alone.
+    def reset(self, seed=None):
+        self.game.reset(seed=seed)
 
         self.done = False
         self.reward_step_counter = 0
 
         obs = self._generate_observation()
+        if self._frames is not None:
+            obs = self._frames.reset(self._stack_frame(obs))
+        self._action_mask = np.array([self.game.get_action_mask()])
         return obs
     
     def step(self, action):
-        self.done, info = self.game.step(action) # info = {"snake_size": int, "snake_head_pos": np.array, "prev_snake_head_pos": np.array, "food_pos": np.array, "food_obtained": bool}
+        self.done, step_info = self.game.step(action) # StepInfo(snake_size, snake_head_pos, prev_snake_head_pos, food_pos, food_obtained)
         obs = self._generate_observation()
+        if self._frames is not None:
+            obs = self._frames.push(self._stack_frame(obs))
+        self._action_mask = np.array([self.game.get_action_mask()])
+
+        info = legacy_info_dict(step_info) if self.legacy_info else step_info._asdict()
+        info["action_mask"] = self._action_mask[0]
 
         reward = 0.0
         self.reward_step_counter += 1
 
-        if info["snake_size"] == self.grid_size: # Snake fills up the entire board. Game over.
+        if step_info.snake_size == self.grid_size: # Snake fills up the entire board. Game over.
             reward = self.max_growth * 0.1 # Victory reward
             self.done = True
             if not self.silent_mode:
-                self.game.sound_victory.play()
-            return obs, reward, self.done, info
+                self.game.renderer.sound_victory.play()
+            return self._final_observation(obs), reward, self.done, info
         
         if self.reward_step_counter > self.step_limit: # Step limit reached, game over.
             self.reward_step_counter = 0
@@ -63,21 +123,24 @@ class SnakeEnv(gym.Env):
         
         if self.done: # Snake bumps into wall or itself. Episode is over.
             # Game Over penalty is based on snake size.
-            reward = - math.pow(self.max_growth, (self.grid_size - info["snake_size"]) / self.max_growth) # (-max_growth, -1)            
+            reward = - math.pow(self.max_growth, (self.grid_size - step_info.snake_size) / self.max_growth) # (-max_growth, -1)            
             reward = reward * 0.1
-            return obs, reward, self.done, info
+            return self._final_observation(obs), reward, self.done, info
           
-        elif info["food_obtained"]: # Food eaten. Reward boost on snake size.
-            reward = info["snake_size"] / self.grid_size
+        elif step_info.food_obtained: # Food eaten. Reward boost on snake size.
+            reward = step_info.snake_size / self.grid_size
             self.reward_step_counter = 0 # Reset reward step counter
         
         else:
             # Give a tiny reward/penalty to the agent based on whether it is heading towards the food or not.
             # Not competing with game over penalty or the food eaten reward.
-            if np.linalg.norm(info["snake_head_pos"] - info["food_pos"]) < np.linalg.norm(info["prev_snake_head_pos"] - info["food_pos"]):
-                reward = 1 / info["snake_size"]
+            head_row, head_col = step_info.snake_head_pos
+            prev_head_row, prev_head_col = step_info.prev_snake_head_pos
+            food_row, food_col = step_info.food_pos
+            if (head_row - food_row) ** 2 + (head_col - food_col) ** 2 < (prev_head_row - food_row) ** 2 + (prev_head_col - food_col) ** 2: # Squared distances.
+                reward = 1 / step_info.snake_size
             else:
-                reward = - 1 / info["snake_size"]
+                reward = - 1 / step_info.snake_size
             reward = reward * 0.1
 
         # max_score: 72 + 14.1 = 86.1
@@ -88,82 +151,58 @@ class SnakeEnv(gym.Env):
     def render(self):
         self.game.render()
 
+    # Mask of valid actions for the current state, computed once per step/reset from the game's occupancy grid.
     def get_action_mask(self):
-        return np.array([[self._check_action_validity(a) for a in range(self.action_space.n)]])
-    
-    # Check if the action is against the current direction of the snake or is ending the game.
-    def _check_action_validity(self, action):
-        current_direction = self.game.direction
-        snake_list = self.game.snake
-        row, col = snake_list[0]
-        if action == 0: # UP
-            if current_direction == "DOWN":
-                return False
-            else:
-                row -= 1
-
-        elif action == 1: # LEFT
-            if current_direction == "RIGHT":
-                return False
-            else:
-                col -= 1
+        return self._action_mask
 
-        elif action == 2: # RIGHT 
-            if current_direction == "LEFT":
-                return False
-            else:
-                col += 1     
-        
-        elif action == 3: # DOWN 
-            if current_direction == "UP":
-                return False
-            else:
-                row += 1
-
-        # Check if snake collided with itself or the wall. Note that the tail of the snake would be poped if the snake did not eat food in the current step.
-        if (row, col) == self.game.food:
-            game_over = (
-                (row, col) in snake_list # The snake won't pop the last cell if it ate food.
-                or row < 0
-                or row >= self.board_size
-                or col < 0
-                or col >= self.board_size
-            )
-        else:
-            game_over = (
-                (row, col) in snake_list[:-1] # The snake will pop the last cell if it did not eat food.
-                or row < 0
-                or row >= self.board_size
-                or col < 0
-                or col >= self.board_size
-            )
+    # The last observation of an episode has to outlive the reset that follows: vec envs keep it as the terminal
+    # observation. reset() rewrites the reused observation buffer, so it is returned as a copy; stacked observations
+    # are already left intact by FrameStack.reset().
+    def _final_observation(self, obs):
+        return obs if self._frames is not None else obs.copy()
 
-        if game_over:
-            return False
-        else:
-            return True
+    # Frame as stored by the frame stack: channel-first, so that stacked frames form one image.
+    def _stack_frame(self, obs):
+        return obs if self.compact else obs.transpose(2, 0, 1)
 
     # EMPTY: BLACK; SnakeBODY: GRAY; SnakeHEAD: GREEN; FOOD: RED;
+    # The returned array is a reused buffer that the next step overwrites; copy it to keep an observation around.
     def _generate_observation(self):
-        obs = np.zeros((self.game.board_size, self.game.board_size), dtype=np.uint8)
+        body = self.game.body
+        board_size = self.board_size
+        gray = self._gray
 
         # Set the snake body to gray with linearly decreasing intensity from head to tail.
-        obs[tuple(np.transpose(self.game.snake))] = np.linspace(200, 50, len(self.game.snake), dtype=np.uint8)
-        
+        gray[:] = self._empty_gray
+        for (row, col), intensity in zip(body, self._body_intensity[len(body)]):
+            gray[row * board_size + col] = intensity
+
+        if self.compact:
+            # Planes: BODY gray levels, HEAD, TAIL, FOOD (255 on the cell, 0 elsewhere).
+            planes = self._planes
+            planes[BODY_PLANE] = self._gray_board[:, :, 0]
+            planes[HEAD_PLANE:].fill(0)
+            planes[(HEAD_PLANE,) + body[0]] = 255
+            planes[(TAIL_PLANE,) + body[-1]] = 255
+            planes[(FOOD_PLANE,) + self.game.food] = 255
+            return planes
+
         # Stack single layer into 3-channel-image.
-        obs = np.stack((obs, obs, obs), axis=-1)
-        
+        obs = self._board_obs
+        obs[:] = self._gray_board
+
         # Set the snake head to green and the tail to blue
-        obs[tuple(self.game.snake[0])] = [0, 255, 0]
-        obs[tuple(self.game.snake[-1])] = [255, 0, 0]
+        obs[body[0]] = (0, 255, 0)
+        obs[body[-1]] = (255, 0, 0)
 
         # Set the food to red
-        obs[self.game.food] = [0, 0, 255]
+        obs[self.game.food] = (0, 0, 255)
 
-        # Enlarge the observation to 84x84
-        obs = np.repeat(np.repeat(obs, 7, axis=0), 7, axis=1)
+        # Enlarge the observation to 84x84: widen every board row 7 times, then copy it down the 7 pixel rows of its block.
+        self._wide_cells[:] = obs[:, :, None, :]
+        self._obs_rows[:] = self._wide_rows[:, None]
 
-        return obs
+        return self._obs
 
 # Test the environment using random actions
 # NUM_EPISODES = 100
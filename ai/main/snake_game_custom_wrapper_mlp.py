@@ -1,17 +1,19 @@
 import math
-import time # For debugging.
 
 import gym
 import numpy as np
 
-from snake_game import SnakeGame
+from snake_game import SnakeGame, legacy_info_dict
+from frame_stack import FrameStack
 
 class SnakeEnv(gym.Env):
-    def __init__(self, seed=0, board_size=12, silent_mode=True, limit_step=True):
+    def __init__(self, seed=0, board_size=12, silent_mode=True, limit_step=True, legacy_info=False, frame_stack=1):
         super().__init__()
         self.game = SnakeGame(seed=seed, board_size=board_size, silent_mode=silent_mode)
         self.game.reset()
 
+        self.legacy_info = legacy_info # Return info dicts with np.array positions, as SnakeGame used to.
+
         self.action_space = gym.spaces.Discrete(4) # 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN
         
         self.observation_space = gym.spaces.Box(
@@ -20,6 +22,13 @@ class SnakeEnv(gym.Env):
             dtype=np.float32
         ) # 0: empty, 0.5: snake body, 1: snake head, -1: food
 
+        # Observe the last frame_stack boards, oldest first: (frame_stack, board_size, board_size).
+        if frame_stack > 1:
+            self._frames = FrameStack(frame_stack, self.observation_space.shape, np.float32)
+            self.observation_space = gym.spaces.Box(low=-1, high=1, shape=self._frames.stacked_shape, dtype=np.float32)
+        else:
+            self._frames = None
+
         self.board_size = board_size
         self.grid_size = board_size ** 2 # Max length of snake is board_size^2
         self.init_snake_size = len(self.game.snake)
@@ -32,19 +41,30 @@ class SnakeEnv(gym.Env):
         else:
             self.step_limit = 1e9 # Basically no limit.
         self.reward_step_counter = 0
+        self._action_mask = np.array([self.game.get_action_mask()])
 
-    def reset(self):
-        self.game.reset()
+    # A seed restarts the game's random stream, so that the round can be replayed from the seed alone.
+    def reset(self, seed=None):
+        self.game.reset(seed=seed)
 
         self.done = False
         self.reward_step_counter = 0
 
         obs = self._generate_observation()
+        if self._frames is not None:
+            obs = self._frames.reset(obs)
+        self._action_mask = np.array([self.game.get_action_mask()])
         return obs
     
     def step(self, action):
-        self.done, info = self.game.step(action) # info = {"snake_size": int, "snake_head_pos": np.array, "prev_snake_head_pos": np.array, "food_pos": np.array, "food_obtained": bool}
+        self.done, step_info = self.game.step(action) # StepInfo(snake_size, snake_head_pos, prev_snake_head_pos, food_pos, food_obtained)
         obs = self._generate_observation()
+        if self._frames is not None:
+            obs = self._frames.push(obs)
+        self._action_mask = np.array([self.game.get_action_mask()])
+
+        info = legacy_info_dict(step_info) if self.legacy_info else step_info._asdict()
+        info["action_mask"] = self._action_mask[0]
 
         reward = 0.0
         self.reward_step_counter += 1
@@ -55,23 +75,26 @@ class SnakeEnv(gym.Env):
         
         if self.done: # Snake bumps into wall or itself. Episode is over.
             # Game Over penalty is based on snake size.
-            # reward = - math.pow(self.max_growth, (self.grid_size - info["snake_size"]) / self.max_growth) # (-max_growth, -1)
+            # reward = - math.pow(self.max_growth, (self.grid_size - step_info.snake_size) / self.max_growth) # (-max_growth, -1)
             # return obs, reward * 0.1, self.done, info
 
             # Linear penalty decay.
-            reward = info["snake_size"] - self.grid_size # (-max_growth, 0)
+            reward = step_info.snake_size - self.grid_size # (-max_growth, 0)
             return obs, reward * 0.1, self.done, info
         
-        elif info["food_obtained"]: # food eaten
+        elif step_info.food_obtained: # food eaten
             # Reward on num_steps between getting food.
             reward = math.exp((self.grid_size - self.reward_step_counter) / self.grid_size) # (0, e)
             self.reward_step_counter = 0 # Reset reward step counter
         
         else:
-            if np.linalg.norm(info["snake_head_pos"] - info["food_pos"]) < np.linalg.norm(info["prev_snake_head_pos"] - info["food_pos"]):
-                reward = 1 / info["snake_size"] # No upper limit might enable the agent to master shorter scenario faster and more firmly.
+            head_row, head_col = step_info.snake_head_pos
+            prev_head_row, prev_head_col = step_info.prev_snake_head_pos
+            food_row, food_col = step_info.food_pos
+            if (head_row - food_row) ** 2 + (head_col - food_col) ** 2 < (prev_head_row - food_row) ** 2 + (prev_head_col - food_col) ** 2: # Squared distances.
+                reward = 1 / step_info.snake_size # No upper limit might enable the agent to master shorter scenario faster and more firmly.
             else:
-                reward = - 1 / info["snake_size"]
+                reward = - 1 / step_info.snake_size
             # print(reward*0.1)
             # time.sleep(1)
 
@@ -88,60 +111,9 @@ class SnakeEnv(gym.Env):
     def render(self):
         self.game.render()
 
+    # Mask of valid actions for the current state, computed once per step/reset from the game's occupancy grid.
     def get_action_mask(self):
-        return np.array([[self._check_action_validity(a) for a in range(self.action_space.n)]])
-    
-    # Check if the action is against the current direction of the snake or is ending the game.
-    def _check_action_validity(self, action):
-        current_direction = self.game.direction
-        snake_list = self.game.snake
-        row, col = snake_list[0]
-        if action == 0: # UP
-            if current_direction == "DOWN":
-                return False
-            else:
-                row -= 1
-
-        elif action == 1: # LEFT
-            if current_direction == "RIGHT":
-                return False
-            else:
-                col -= 1
-
-        elif action == 2: # RIGHT 
-            if current_direction == "LEFT":
-                return False
-            else:
-                col += 1     
-        
-        elif action == 3: # DOWN 
-            if current_direction == "UP":
-                return False
-            else:
-                row += 1
-
-        # Check if snake collided with itself or the wall. Note that the tail of the snake would be poped if the snake did not eat food in the current step.
-        if (row, col) == self.game.food:
-            game_over = (
-                (row, col) in snake_list # The snake won't pop the last cell if it ate food.
-                or row < 0
-                or row >= self.board_size
-                or col < 0
-                or col >= self.board_size
-            )
-        else:
-            game_over = (
-                (row, col) in snake_list[:-1] # The snake will pop the last cell if it did not eat food.
-                or row < 0
-                or row >= self.board_size
-                or col < 0
-                or col >= self.board_size
-            )
-
-        if game_over:
-            return False
-        else:
-            return True
+        return self._action_mask
 
     # EMPTY: 0; SnakeBODY: 0.5; SnakeHEAD: 1; FOOD: -1;
     def _generate_observation(self):
@@ -0,0 +1,284 @@
+import os
+import time
+import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from stable_baselines3.common.env_util import is_wrapped
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv
+
+# Arrays kept in the shared memory block. Observations, terminal observations, rewards and dones exist twice and are
+# written in turn: the learner still holds the previous step's arrays while the next step is written.
+def _shared_layout(num_envs, obs_shape, obs_dtype):
+    return [
+        ("obs", (2, num_envs) + obs_shape, np.dtype(obs_dtype)),
+        ("terminal_obs", (2, num_envs) + obs_shape, np.dtype(obs_dtype)),
+        ("rewards", (2, num_envs), np.dtype(np.float64)),
+        ("dones", (2, num_envs), np.dtype(np.bool_)),
+        ("actions", (num_envs,), np.dtype(np.int64)),
+        ("action_masks", (num_envs, 4), np.dtype(np.bool_)), # 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN
+        ("step_times", (num_envs,), np.dtype(np.float64)), # Seconds the last step of every env took, reset included.
+    ]
+
+# Byte offset of every array in the block, and the size of the block.
+def _shared_offsets(layout):
+    offsets = []
+    size = 0
+    for _, shape, dtype in layout:
+        size = -(-size // dtype.alignment) * dtype.alignment
+        offsets.append(size)
+        size += int(np.prod(shape)) * dtype.itemsize
+    return offsets, size
+
+# np.ndarray views of every array in the block; the learner and the workers build the same views from the same block.
+def _shared_arrays(shm, num_envs, obs_shape, obs_dtype):
+    layout = _shared_layout(num_envs, obs_shape, obs_dtype)
+    offsets, _ = _shared_offsets(layout)
+    return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset) for (name, shape, dtype), offset in zip(layout, offsets)}
+
+# One logical CPU per physical core that this process may run on, e.g. to pin one worker per core. Read from
+# /proc/cpuinfo on Linux; elsewhere every logical CPU counts as a core.
+def physical_cores():
+    if hasattr(os, "sched_getaffinity"):
+        allowed = sorted(os.sched_getaffinity(0))
+    else:
+        allowed = list(range(os.cpu_count() or 1))
+    try:
+        with open("/proc/cpuinfo") as f:
+            blocks = f.read().strip().split("\n\n")
+    except OSError:
+        return allowed
+    first_cpu_of_core = {}
+    for block in blocks:
+        fields = dict(line.split(":", 1) for line in block.splitlines() if ":" in line)
+        fields = {key.strip(): value.strip() for key, value in fields.items()}
+        if "processor" not in fields:
+            continue
+        cpu = int(fields["processor"])
+        core = (fields.get("physical id", "0"), fields.get("core id", fields["processor"]))
+        if cpu in allowed and core not in first_cpu_of_core:
+            first_cpu_of_core[core] = cpu
+    return sorted(first_cpu_of_core.values()) or allowed
+
+# Hosts the envs with indices first_index, first_index + 1, ... of the vec env and steps them in one loop per command.
+def _worker(remote, parent_remote, env_fns_wrapper, first_index, cpu):
+    parent_remote.close()
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    envs = [env_fn() for env_fn in env_fns_wrapper.var]
+    indices = range(first_index, first_index + len(envs))
+    shm = None
+    arrays = None
+
+    def step_env(slot, index, env, action):
+        start = time.perf_counter()
+        observation, reward, done, info = env.step(action)
+        if done:
+            # Save the final observation where the learner can read it, and reset.
+            arrays["terminal_obs"][slot, index] = observation
+            observation = env.reset()
+        arrays["obs"][slot, index] = observation
+        arrays["rewards"][slot, index] = reward
+        arrays["dones"][slot, index] = done
+        arrays["action_masks"][index] = np.reshape(env.action_masks(), -1)
+        info.pop("action_mask", None) # Read from the shared action masks instead.
+        arrays["step_times"][index] = time.perf_counter() - start
+        return info
+
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                slot = data
+                remote.send([step_env(slot, index, env, int(arrays["actions"][index])) for index, env in zip(indices, envs)])
+            elif cmd == "step_some": # Step only the given envs; answer with their indices and infos (SnakeEnvPool).
+                slot, steps = data
+                remote.send([(indices[local_id], step_env(slot, indices[local_id], envs[local_id], action)) for local_id, action in steps])
+            elif cmd == "reset":
+                for index, env in zip(indices, envs):
+                    arrays["obs"][data, index] = env.reset()
+                    arrays["action_masks"][index] = np.reshape(env.action_masks(), -1)
+                remote.send(None)
+            elif cmd == "attach":
+                shm = shared_memory.SharedMemory(name=data[0])
+                arrays = _shared_arrays(shm, *data[1:])
+                remote.send(None)
+            elif cmd == "close":
+                for env in envs:
+                    env.close()
+                if shm is not None:
+                    arrays = None
+                    shm.close()
+                remote.close()
+                break
+            elif cmd == "get_spaces":
+                remote.send((envs[0].observation_space, envs[0].action_space))
+            # The commands below address some of the worker's envs: data starts with their positions in envs.
+            elif cmd == "seed":
+                remote.send([envs[i].seed(seed) for i, seed in data])
+            elif cmd == "env_method":
+                local_ids, name, args, kwargs = data
+                remote.send([getattr(envs[i], name)(*args, **kwargs) for i in local_ids])
+            elif cmd == "get_attr":
+                local_ids, name = data
+                remote.send([getattr(envs[i], name) for i in local_ids])
+            elif cmd == "set_attr":
+                local_ids, name, value = data
+                for i in local_ids:
+                    setattr(envs[i], name, value)
+                remote.send(None)
+            elif cmd == "is_wrapped":
+                local_ids, wrapper_class = data
+                remote.send([is_wrapped(envs[i], wrapper_class) for i in local_ids])
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except EOFError:
+            break
+
+# Drop-in replacement for SubprocVecEnv with the same env_fns. Observations, rewards, dones and action masks travel
+# through one shared memory block instead of being pickled through the pipes, which only carry commands and the small
+# info dicts. step() and reset() return views into the block that stay valid until the step after next, so the
+# learner reads them without any copy.
+# Every worker process hosts a group of consecutive envs and steps them in a loop, answering with one message, so the
+# cost per step is one pipe round trip per worker instead of per env. By default there is one worker per physical
+# core (at most one per env); pin_cpus binds each worker to its own core.
+class SharedMemoryVecEnv(VecEnv):
+    def __init__(self, env_fns, start_method=None, num_workers=None, pin_cpus=False):
+        self.waiting = False
+        self.closed = False
+        num_envs = len(env_fns)
+
+        cores = physical_cores()
+        if num_workers is None:
+            num_workers = len(cores)
+        num_workers = max(1, min(num_workers, num_envs))
+        # Split the envs into num_workers groups of consecutive indices whose sizes differ by at most one.
+        bounds = [num_envs * i // num_workers for i in range(num_workers + 1)]
+        self.worker_ranges = [range(bounds[i], bounds[i + 1]) for i in range(num_workers)]
+        self.env_locations = [(worker, index - bounds[worker]) for worker in range(num_workers) for index in self.worker_ranges[worker]]
+
+        if start_method is None:
+            # forkserver is way faster than spawn and safe for torch, as in SubprocVecEnv.
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+        # Start the resource tracker before the workers so that they share it, and the block is only tracked (and unlinked) once.
+        resource_tracker.ensure_running()
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(num_workers)])
+        self.processes = []
+        for worker, (work_remote, remote, env_range) in enumerate(zip(self.work_remotes, self.remotes, self.worker_ranges)):
+            cpu = cores[worker % len(cores)] if pin_cpus else None
+            args = (work_remote, remote, CloudpickleWrapper([env_fns[i] for i in env_range]), env_range.start, cpu)
+            process = ctx.Process(target=_worker, args=args, daemon=True) # daemon: if the main process crashes, workers go too.
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.remotes[0].send(("get_spaces", None))
+        observation_space, action_space = self.remotes[0].recv()
+        super().__init__(num_envs, observation_space, action_space)
+
+        # Create the shared block once the observation shape is known, then let every worker map it.
+        obs_shape = tuple(observation_space.shape)
+        obs_dtype = observation_space.dtype.str
+        _, size = _shared_offsets(_shared_layout(num_envs, obs_shape, obs_dtype))
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._arrays = _shared_arrays(self._shm, num_envs, obs_shape, obs_dtype)
+        for remote in self.remotes:
+            remote.send(("attach", (self._shm.name, num_envs, obs_shape, obs_dtype)))
+        for remote in self.remotes:
+            remote.recv()
+
+        self._slot = 0 # Half of the double-buffered arrays written by the current step.
+
+    def step_async(self, actions):
+        self._arrays["actions"][:] = actions
+        self._slot ^= 1
+        for remote in self.remotes:
+            remote.send(("step", self._slot))
+        self.waiting = True
+
+    def step_wait(self):
+        infos = []
+        for remote in self.remotes:
+            infos.extend(remote.recv())
+        self.waiting = False
+        slot = self._slot
+        dones = self._arrays["dones"][slot]
+        for i in np.flatnonzero(dones):
+            infos[i]["terminal_observation"] = self._arrays["terminal_obs"][slot, i]
+        return self._arrays["obs"][slot], self._arrays["rewards"][slot], dones, infos
+
+    def reset(self):
+        self._slot ^= 1
+        for remote in self.remotes:
+            remote.send(("reset", self._slot))
+        for remote in self.remotes:
+            remote.recv()
+        return self._arrays["obs"][self._slot]
+
+    def action_masks(self):
+        return self._arrays["action_masks"]
+
+    # Seconds the last step of every env took in its worker, automatic reset included.
+    def step_times(self):
+        return self._arrays["step_times"]
+
+    def seed(self, seed=None):
+        if seed is None:
+            seed = np.random.randint(0, 2**32 - 1)
+        for remote, env_range in zip(self.remotes, self.worker_ranges):
+            remote.send(("seed", [(i - env_range.start, seed + i) for i in env_range]))
+        seeds = []
+        for remote in self.remotes:
+            seeds.extend(remote.recv())
+        return seeds
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self._arrays = None
+        self._shm.close()
+        self._shm.unlink()
+        self.closed = True
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call_envs(indices, "get_attr", attr_name)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call_envs(indices, "set_attr", attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        if method_name == "action_masks": # Called by MaskablePPO once per step for all envs; no round trip needed.
+            return [self._arrays["action_masks"][i] for i in self._get_indices(indices)]
+        return self._call_envs(indices, "env_method", method_name, method_args, method_kwargs)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._call_envs(indices, "is_wrapped", wrapper_class)
+
+    # Send a command to the workers hosting the given envs and return the answers in the order of indices.
+    def _call_envs(self, indices, cmd, *args):
+        indices = list(self._get_indices(indices))
+        local_ids = {}
+        for index in indices:
+            worker, local_id = self.env_locations[index]
+            local_ids.setdefault(worker, []).append(local_id)
+        for worker, ids in local_ids.items():
+            self.remotes[worker].send((cmd, (ids,) + args))
+        answers = {worker: self.remotes[worker].recv() for worker in local_ids}
+        if cmd == "set_attr":
+            return None
+        positions = {worker: 0 for worker in local_ids}
+        results = []
+        for index in indices:
+            worker, _ = self.env_locations[index]
+            results.append(answers[worker][positions[worker]])
+            positions[worker] += 1
+        return results
@@ -0,0 +1,234 @@
+import math
+import time
+
+import gym
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from batch_snake_game import BatchSnakeGame
+from frame_stack import FrameStack
+from snake_game_custom_wrapper_cnn import body_intensity_table, NUM_PLANES, BODY_PLANE, HEAD_PLANE, TAIL_PLANE, FOOD_PLANE
+
+# In-process vectorized version of the CNN SnakeEnv: all boards live in one BatchSnakeGame and every
+# observation is written into a preallocated (num_envs, 84, 84, 3) buffer. Provides action masks directly,
+# so MaskablePPO can be used without the ActionMasker wrapper.
+class SnakeVecEnv(VecEnv):
+    SHARED_ATTRS = ("board_size", "grid_size", "scale", "compact", "step_limit") # Same for every board.
+
+    def __init__(self, num_envs, seed=0, board_size=12, limit_step=True, compact=False, frame_stack=1):
+        self.game = BatchSnakeGame(num_envs, seed=seed, board_size=board_size)
+
+        action_space = gym.spaces.Discrete(4) # 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN
+        self.scale = 7 # Each board cell becomes a 7x7 pixel block (84x84 for a 12x12 board).
+        self.compact = compact # Observe the raw boards as (4, board_size, board_size) planes, as SnakeEnv(compact=True).
+        if compact:
+            frame_shape = (NUM_PLANES, board_size, board_size)
+        else:
+            frame_shape = (board_size * self.scale, board_size * self.scale, 3)
+
+        # Observe the last frame_stack frames of every board, as SnakeEnv(frame_stack=...).
+        if frame_stack > 1:
+            self._frames = FrameStack(frame_stack, frame_shape if compact else (3,) + frame_shape[:2], np.uint8, num_envs)
+            observation_space = gym.spaces.Box(low=0, high=255, shape=self._frames.stacked_shape, dtype=np.uint8)
+        else:
+            self._frames = None
+            observation_space = gym.spaces.Box(low=0, high=255, shape=frame_shape, dtype=np.uint8)
+        super().__init__(num_envs, observation_space, action_space)
+
+        self.board_size = board_size
+        self.grid_size = board_size ** 2 # Max length of snake is board_size^2
+        self.init_snake_size = len(self.game._initial_body)
+        self.max_growth = self.grid_size - self.init_snake_size
+
+        if limit_step:
+            self.step_limit = self.grid_size * 4 # More than enough steps to get the food.
+        else:
+            self.step_limit = 1e9 # Basically no limit.
+        self.reward_step_counter = np.zeros(num_envs, dtype=np.int64)
+
+        # Two observation buffers used in turn: the learner still holds the previous observation while the next step is written.
+        self._obs_buffers = [np.zeros((num_envs,) + frame_shape, dtype=np.uint8) for _ in range(2)]
+        self._obs_index = 0
+        self._small_obs = np.zeros((num_envs, self.grid_size + 1, 3), dtype=np.uint8) # Extra cell absorbs writes of unused body slots.
+        self._small_planes = np.zeros((num_envs, NUM_PLANES, self.grid_size + 1), dtype=np.uint8)
+        self._body_intensity = body_intensity_table(self.grid_size)
+
+        self._actions = None
+        self._action_masks = None
+        self.last_info = None
+
+        self.episode_returns = np.zeros(num_envs, dtype=np.float64)
+        self.episode_lengths = np.zeros(num_envs, dtype=np.int64)
+        self.episode_start_times = np.full(num_envs, time.time())
+
+    def reset(self):
+        self.game.reset()
+        self.reward_step_counter[:] = 0
+        self.episode_returns[:] = 0.0
+        self.episode_lengths[:] = 0
+        self.episode_start_times[:] = time.time()
+
+        obs = self._next_obs_buffer()
+        self._generate_observation(obs)
+        if self._frames is not None:
+            obs = self._frames.reset(self._stack_frames(obs))
+        self._action_masks = self.game.get_action_mask()
+        return obs
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        done, info = self.game.step(self._actions)
+        self.last_info = info
+        size = info["snake_size"]
+        food_obtained = info["food_obtained"]
+
+        reward = np.zeros(self.num_envs, dtype=np.float64)
+        self.reward_step_counter += 1
+
+        # Snake fills up the entire board. Game over.
+        victory = size == self.grid_size
+        reward[victory] = self.max_growth * 0.1 # Victory reward
+
+        # Step limit reached, game over.
+        limit_reached = ~victory & (self.reward_step_counter > self.step_limit)
+        self.reward_step_counter[limit_reached] = 0
+        done = done | victory | limit_reached
+
+        # Snake bumps into wall or itself. Game Over penalty is based on snake size.
+        game_over = done & ~victory
+        for i in np.flatnonzero(game_over): # math.pow keeps the penalty bit-identical to SnakeEnv.
+            reward[i] = - math.pow(self.max_growth, (self.grid_size - size[i]) / self.max_growth) * 0.1 # (-max_growth, -1)
+
+        # Food eaten. Reward boost on snake size.
+        ate = ~done & food_obtained
+        reward[ate] = size[ate] / self.grid_size
+        self.reward_step_counter[ate] = 0
+
+        # Tiny reward/penalty based on whether the snake is heading towards the food or not.
+        moved = ~done & ~food_obtained
+        head_dist = np.square(info["snake_head_pos"] - info["food_pos"]).sum(axis=1)
+        prev_head_dist = np.square(info["prev_snake_head_pos"] - info["food_pos"]).sum(axis=1)
+        towards = np.where(head_dist < prev_head_dist, 1.0, -1.0)
+        reward[moved] = towards[moved] / size[moved] * 0.1
+
+        self.episode_returns += reward
+        self.episode_lengths += 1
+
+        frames = obs = self._next_obs_buffer()
+        self._generate_observation(frames)
+        if self._frames is not None:
+            obs = self._frames.push(self._stack_frames(frames))
+
+        infos = [{} for _ in range(self.num_envs)]
+        done_ids = np.flatnonzero(done)
+        if len(done_ids) > 0:
+            now = time.time()
+            for i in done_ids:
+                infos[i]["terminal_observation"] = obs[i].copy()
+                infos[i]["snake_size"] = int(size[i])
+                infos[i]["episode"] = {
+                    "r": round(float(self.episode_returns[i]), 6),
+                    "l": int(self.episode_lengths[i]),
+                    "t": round(now - self.episode_start_times[i], 6)
+                }
+
+            # Auto-reset finished boards and overwrite their observations with the first observation of the next episode.
+            self.game.reset(done_ids)
+            self.reward_step_counter[done_ids] = 0
+            self.episode_returns[done_ids] = 0.0
+            self.episode_lengths[done_ids] = 0
+            self.episode_start_times[done_ids] = now
+            self._generate_observation(frames, done_ids)
+            if self._frames is not None:
+                obs = self._frames.reset(self._stack_frames(frames)[done_ids], done_ids)
+
+        self._action_masks = self.game.get_action_mask()
+        return obs, reward, done, infos
+
+    def action_masks(self):
+        return self._action_masks
+
+    # Frames as stored by the frame stack: channel-first, so that stacked frames form one image.
+    def _stack_frames(self, frames):
+        return frames if self.compact else frames.transpose(0, 3, 1, 2)
+
+    def _next_obs_buffer(self):
+        self._obs_index ^= 1
+        return self._obs_buffers[self._obs_index]
+
+    # EMPTY: BLACK; SnakeBODY: GRAY; SnakeHEAD: GREEN; SnakeTAIL: BLUE; FOOD: RED; (same pixels as SnakeEnv._generate_observation)
+    def _generate_observation(self, out, ids=None):
+        game = self.game
+        if ids is None:
+            ids = game._boards
+        rows = np.arange(len(ids))[:, None]
+
+        # Snake cells from head to tail; slots past the snake length point at the spare cell.
+        ring = game._ring[None, :]
+        length = game.length[ids]
+        cells = game.body[ids[:, None], (game.head[ids][:, None] + ring) % self.grid_size]
+        cells = np.where(ring < length[:, None], cells, self.grid_size)
+
+        if self.compact:
+            # Planes: BODY gray levels, HEAD, TAIL, FOOD (same values as SnakeEnv._generate_observation with compact=True).
+            planes = self._small_planes[:len(ids)]
+            planes.fill(0)
+            planes[rows, BODY_PLANE, cells] = self._body_intensity[length]
+            rows = rows[:, 0]
+            planes[rows, HEAD_PLANE, cells[:, 0]] = 255
+            planes[rows, TAIL_PLANE, cells[rows, length - 1]] = 255
+            planes[rows, FOOD_PLANE, game.food[ids]] = 255
+            out[ids] = planes[:, :, :self.grid_size].reshape(len(ids), NUM_PLANES, self.board_size, self.board_size)
+            return
+
+        small = self._small_obs[:len(ids)]
+        small.fill(0)
+
+        # Set the snake body to gray with linearly decreasing intensity from head to tail.
+        small[rows, cells] = self._body_intensity[length][:, :, None]
+
+        # Set the snake head to green, the tail to blue and the food to red.
+        rows = rows[:, 0]
+        small[rows, cells[:, 0]] = (0, 255, 0)
+        small[rows, cells[rows, length - 1]] = (255, 0, 0)
+        small[rows, game.food[ids]] = (0, 0, 255)
+
+        # Enlarge every cell to a scale x scale block straight into the output buffer: widen each board row once,
+        # then copy it down the remaining pixel rows of its block.
+        pixel_rows = out.reshape(self.num_envs, self.board_size, self.scale, self.board_size * self.scale, 3)
+        wide = np.repeat(small[:, :self.grid_size].reshape(len(ids), self.board_size, self.board_size, 3), self.scale, axis=2)
+        if len(ids) == self.num_envs:
+            pixel_rows[:, :, 0] = wide
+            pixel_rows[:, :, 1:] = pixel_rows[:, :, :1]
+        else:
+            pixel_rows[ids] = wide[:, :, None]
+
+    def close(self):
+        pass
+
+    def seed(self, seed=None):
+        self.game.rng = np.random.default_rng(seed)
+        return [seed for _ in range(self.num_envs)]
+
+    # The boards have no env objects of their own: per-env calls only cover the settings every board shares
+    # (SHARED_ATTRS) and the action masks; anything else raises NotImplementedError.
+    def get_attr(self, attr_name, indices=None):
+        if attr_name not in self.SHARED_ATTRS and attr_name != "action_masks": # MaskablePPO checks for action_masks.
+            raise NotImplementedError(f"SnakeVecEnv has no per-env attribute {attr_name!r}.")
+        attr = getattr(self, attr_name)
+        return [attr for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        if attr_name != "step_limit" or len(set(self._get_indices(indices))) != self.num_envs:
+            raise NotImplementedError("SnakeVecEnv can only set step_limit, of all envs at once.")
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        if method_name != "action_masks": # Called by MaskablePPO once per step for all envs.
+            raise NotImplementedError(f"SnakeVecEnv cannot call {method_name!r} on single envs.")
+        return [self._action_masks[i] for i in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
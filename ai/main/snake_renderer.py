@@ -0,0 +1,142 @@
+import os
+import sys
+
+import numpy as np
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+import pygame
+from pygame import mixer
+
+# Window, drawing and sound effects of a SnakeGame. Only games created with silent_mode=False import this module,
+# so headless training workers never load pygame/SDL.
+class SnakeRenderer:
+    def __init__(self, game):
+        self.game = game
+
+        self.cell_size = 40
+        self.width = self.height = game.board_size * self.cell_size
+
+        self.border_size = 20
+        self.display_width = self.width + 2 * self.border_size
+        self.display_height = self.height + 2 * self.border_size + 40
+
+        pygame.init()
+        pygame.display.set_caption("Snake Game")
+        self.screen = pygame.display.set_mode((self.display_width, self.display_height))
+        self.font = pygame.font.Font(None, 36)
+
+        # Load sound effects
+        mixer.init()
+        self.sound_eat = mixer.Sound("sound/eat.wav")
+        self.sound_game_over = mixer.Sound("sound/game_over.wav")
+        self.sound_victory = mixer.Sound("sound/victory.wav")
+
+    def draw_score(self):
+        score_text = self.font.render(f"Score: {self.game.score}", True, (255, 255, 255))
+        self.screen.blit(score_text, (self.border_size, self.height + 2 * self.border_size))
+    
+    def draw_welcome_screen(self):
+        title_text = self.font.render("SNAKE GAME", True, (255, 255, 255))
+        start_button_text = "START"
+
+        self.screen.fill((0, 0, 0))
+        self.screen.blit(title_text, (self.display_width // 2 - title_text.get_width() // 2, self.display_height // 4))
+        self.draw_button_text(start_button_text, (self.display_width // 2, self.display_height // 2))
+        pygame.display.flip()
+
+    def draw_game_over_screen(self):
+        game_over_text = self.font.render("GAME OVER", True, (255, 255, 255))
+        final_score_text = self.font.render(f"SCORE: {self.game.score}", True, (255, 255, 255))
+        retry_button_text = "RETRY"
+
+        self.screen.fill((0, 0, 0))
+        self.screen.blit(game_over_text, (self.display_width // 2 - game_over_text.get_width() // 2, self.display_height // 4))
+        self.screen.blit(final_score_text, (self.display_width // 2 - final_score_text.get_width() // 2, self.display_height // 4 + final_score_text.get_height() + 10))
+        self.draw_button_text(retry_button_text, (self.display_width // 2, self.display_height // 2))          
+        pygame.display.flip()
+
+    def draw_button_text(self, button_text_str, pos, hover_color=(255, 255, 255), normal_color=(100, 100, 100)):
+        mouse_pos = pygame.mouse.get_pos()
+        button_text = self.font.render(button_text_str, True, normal_color)
+        text_rect = button_text.get_rect(center=pos)
+        
+        if text_rect.collidepoint(mouse_pos):
+            colored_text = self.font.render(button_text_str, True, hover_color)
+        else:
+            colored_text = self.font.render(button_text_str, True, normal_color)
+        
+        self.screen.blit(colored_text, text_rect)
+    
+    def draw_countdown(self, number):
+        countdown_text = self.font.render(str(number), True, (255, 255, 255))
+        self.screen.blit(countdown_text, (self.display_width // 2 - countdown_text.get_width() // 2, self.display_height // 2 - countdown_text.get_height() // 2))
+        pygame.display.flip()
+
+    def is_mouse_on_button(self, button_text):
+        mouse_pos = pygame.mouse.get_pos()
+        text_rect = button_text.get_rect(
+            center=(
+                self.display_width // 2,
+                self.display_height // 2,
+            )
+        )
+        return text_rect.collidepoint(mouse_pos)
+
+    def render(self):
+        self.screen.fill((0, 0, 0))
+
+        # Draw border
+        pygame.draw.rect(self.screen, (255, 255, 255), (self.border_size - 2, self.border_size - 2, self.width + 4, self.height + 4), 2)
+
+        # Draw snake
+        self.draw_snake()
+        
+        # Draw food
+        if len(self.game.body) < self.game.grid_size: # If the snake occupies the entire board, don't draw food.
+            r, c = self.game.food
+            pygame.draw.rect(self.screen, (255, 0, 0), (c * self.cell_size + self.border_size, r * self.cell_size + self.border_size, self.cell_size, self.cell_size))
+
+        # Draw score
+        self.draw_score()
+
+        pygame.display.flip()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+
+    def draw_snake(self):
+        # Draw the head
+        snake = self.game.snake
+        head_r, head_c = snake[0]
+        head_x = head_c * self.cell_size + self.border_size
+        head_y = head_r * self.cell_size + self.border_size
+
+        # Draw the head (Blue)
+        pygame.draw.polygon(self.screen, (100, 100, 255), [
+            (head_x + self.cell_size // 2, head_y),
+            (head_x + self.cell_size, head_y + self.cell_size // 2),
+            (head_x + self.cell_size // 2, head_y + self.cell_size),
+            (head_x, head_y + self.cell_size // 2)
+        ])
+
+        eye_size = 3
+        eye_offset = self.cell_size // 4
+        pygame.draw.circle(self.screen, (255, 255, 255), (head_x + eye_offset, head_y + eye_offset), eye_size)
+        pygame.draw.circle(self.screen, (255, 255, 255), (head_x + self.cell_size - eye_offset, head_y + eye_offset), eye_size)
+
+        # Draw the body (color gradient)
+        color_list = np.linspace(255, 100, len(snake), dtype=np.uint8)
+        i = 1
+        for r, c in snake[1:]:
+            body_x = c * self.cell_size + self.border_size
+            body_y = r * self.cell_size + self.border_size
+            body_width = self.cell_size
+            body_height = self.cell_size
+            body_radius = 5
+            pygame.draw.rect(self.screen, (0, color_list[i], 0),
+                            (body_x, body_y, body_width, body_height), border_radius=body_radius)
+            i += 1
+        pygame.draw.rect(self.screen, (255, 100, 100),
+                            (body_x, body_y, body_width, body_height), border_radius=body_radius)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from frame_stack import FrameStack
+
+# Run with: python -m pytest test_frame_stack.py
+# FrameStack against a plain list of the last num_frames frames, holding on to the stacked observations it returned
+# the way SB3 does: the previous one as _last_obs and the current one as the terminal observation.
+
+def check_held(held):
+    for obs, expected in held:
+        assert np.array_equal(obs, expected)
+
+@pytest.mark.parametrize("num_frames", [2, 3, 4])
+def test_single_env_keeps_previous_and_current_obs(num_frames):
+    rng = np.random.default_rng(num_frames)
+    stack = FrameStack(num_frames, (3, 16, 16), np.int64)
+    frame = rng.integers(1, 100, (3, 16, 16))
+    obs = stack.reset(frame)
+    expected = [np.zeros_like(frame)] * (num_frames - 1) + [frame]
+    held = []
+    for step in range(200):
+        held = (held + [(obs, obs.copy())])[-2:]
+        frame = rng.integers(1, 100, (3, 16, 16))
+        if rng.random() < 0.2:
+            obs = stack.reset(frame)
+            expected = [np.zeros_like(frame)] * (num_frames - 1) + [frame]
+        else:
+            obs = stack.push(frame)
+            expected = expected[1:] + [frame]
+        check_held(held)
+        assert np.array_equal(obs, np.concatenate(expected))
+
+@pytest.mark.parametrize("num_frames", [2, 3, 4])
+def test_batched_reset_keeps_previous_and_current_obs(num_frames):
+    num_envs = 5
+    rng = np.random.default_rng(num_frames)
+    stack = FrameStack(num_frames, (4,), np.int64, num_envs)
+    frames = rng.integers(1, 100, (num_envs, 4))
+    obs = stack.reset(frames)
+    expected = [[np.zeros(4, np.int64)] * (num_frames - 1) + [frame] for frame in frames]
+    held = []
+    for step in range(200):
+        held = (held + [(obs, obs.copy())])[-2:]
+        frames = rng.integers(1, 100, (num_envs, 4))
+        obs = stack.push(frames)
+        expected = [env_frames[1:] + [frame] for env_frames, frame in zip(expected, frames)]
+        check_held(held)
+        ids = np.flatnonzero(rng.random(num_envs) < 0.3)
+        if len(ids) > 0: # Auto-reset after the step, as SnakeVecEnv does.
+            held = (held + [(obs, obs.copy())])[-2:]
+            frames = rng.integers(1, 100, (len(ids), 4))
+            obs = stack.reset(frames, ids)
+            for i, frame in zip(ids, frames):
+                expected[i] = [np.zeros(4, np.int64)] * (num_frames - 1) + [frame]
+            check_held(held)
+        assert np.array_equal(obs, np.array(expected))
+
+def test_rejects_stacks_sb3_reads_as_channel_last():
+    with pytest.raises(ValueError):
+        FrameStack(4, (4, 12, 12), np.uint8)
+    assert FrameStack(3, (4, 12, 12), np.uint8).stacked_shape == (12, 12, 12)
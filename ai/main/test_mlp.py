@@ -1,13 +1,21 @@
 import time
 import random
 
-from sb3_contrib import MaskablePPO
-
 from snake_game_custom_wrapper_mlp import SnakeEnv
+from direction import NAMES
+from episode_recording import EpisodeRecorder, save_recordings
 
 MODEL_PATH = r"trained_models_mlp/ppo_snake_final"
+NUMPY_POLICY_PATH = None # e.g. "trained_models_mlp/ppo_snake_final.npz" from export_policy.py: play without torch (always deterministic).
+
+if NUMPY_POLICY_PATH:
+    from numpy_policy import NumpyPolicy
+else:
+    from sb3_contrib import MaskablePPO
 
 NUM_EPISODE = 10
+FRAME_STACK = 1 # Must match FRAME_STACK in train_mlp.py.
+RECORD_PATH = None # e.g. "episodes.rec": save every episode, to watch it again with episode_recording.py.
 
 RENDER = True
 FRAME_DELAY = 0.05 # 0.01 fast, 0.05 slow
@@ -18,12 +26,18 @@ print(f"Using seed = {seed} for testing.")
 
 
 if RENDER:
-    env = SnakeEnv(seed=seed, limit_step=False, silent_mode=False)
+    env = SnakeEnv(seed=seed, limit_step=False, silent_mode=False, frame_stack=FRAME_STACK)
 else:
-    env = SnakeEnv(seed=seed, limit_step=False, silent_mode=True)
+    env = SnakeEnv(seed=seed, limit_step=False, silent_mode=True, frame_stack=FRAME_STACK)
+
+recorder = EpisodeRecorder(env.game) if RECORD_PATH else None
+recordings = []
 
 # Load the trained model
-model = MaskablePPO.load(MODEL_PATH)
+if NUMPY_POLICY_PATH:
+    model = NumpyPolicy.load(NUMPY_POLICY_PATH)
+else:
+    model = MaskablePPO.load(MODEL_PATH)
 
 total_reward = 0
 total_score = 0
@@ -31,7 +45,10 @@ min_score = 1e9
 max_score = 0
 
 for episode in range(NUM_EPISODE):
-    obs = env.reset()
+    episode_seed = random.randint(0, 1e9)
+    obs = env.reset(seed=episode_seed)
+    if recorder is not None:
+        recorder.start(episode_seed)
     episode_reward = 0
     done = False
     
@@ -53,9 +70,11 @@ for episode in range(NUM_EPISODE):
         num_step += 1
 
         obs, reward, done, info = env.step(action)
+        if recorder is not None:
+            recorder.record()
         
         if done:
-            last_action = ["UP", "LEFT", "RIGHT", "DOWN"][action]
+            last_action = NAMES[action]
             print(f"Gameover Penalty: {reward:.4f}. Last action: {last_action}")
         
         elif info["food_obtained"]:
@@ -80,10 +99,15 @@ for episode in range(NUM_EPISODE):
     snake_size = info["snake_size"] + 1
     print(f"Episode {episode + 1}: Reward Sum: {episode_reward:.4f}, Score: {episode_score}, Total Steps: {num_step}, Snake Size: {snake_size}")
     total_reward += episode_reward
+    if recorder is not None:
+        recordings.append(recorder.finish())
     total_score += env.game.score
     if RENDER:
         time.sleep(ROUND_DELAY)
 
 env.close()
+if RECORD_PATH:
+    save_recordings(RECORD_PATH, recordings)
+    print(f"{len(recordings)} episodes saved to {RECORD_PATH}")
 print(f"=================== Summary ==================")
 print(f"Average Score: {total_score / NUM_EPISODE}, Min Score: {min_score}, Max Score: {max_score}, Average reward: {total_reward / NUM_EPISODE}")
@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+import torch
+from stable_baselines3.common.vec_env import SubprocVecEnv
+from stable_baselines3.common.callbacks import CheckpointCallback
+from sb3_contrib import MaskablePPO
+
+from snake_game_shm_vec_env import SharedMemoryVecEnv, physical_cores
+from small_grid_cnn import SmallGridCNN
+from compact_rollout_buffer import use_compact_rollout_buffer
+from training_telemetry import TelemetryCallback, PhaseTimer
+from training_common import linear_schedule, make_env
+
+# One entry point for train_cnn.py and train_mlp.py that also runs on machines without a GPU:
+#     python train.py [--config settings.json] [--policy cnn|mlp] [--device auto|cpu|cuda|mps] [--num-envs N] ...
+# Settings come from DEFAULT_CONFIG, then the config file (a JSON object with any of its keys), then the command line.
+# The device is the GPU if there is one, else the CPU. On the CPU, num_envs, batch_size and torch_threads that are
+# left at None are calibrated: a few short rollouts and updates for every candidate, keeping the setting with the
+# lowest wall time per sample. Everything that was used, the calibration results and the hardware are written to
+# launch_config.json next to the models.
+DEFAULT_CONFIG = {
+    "policy": "cnn", # cnn or mlp.
+    "device": "auto", # auto: cuda, then mps, then cpu.
+    "num_envs": None, # None: 32 (64 on mps), or calibrated on the CPU.
+    "batch_size": None, # None: 512 (4096 on mps), or calibrated on the CPU.
+    "torch_threads": None, # None: torch's default, or calibrated on the CPU.
+    "calibrate": None, # None: on the CPU only. Calibration only fills settings that are None.
+    "n_steps": 2048,
+    "n_epochs": 4,
+    "gamma": 0.94,
+    "learning_rate": None, # [initial, final] of the linear schedule; None: [2.5e-4, 2.5e-6] ([5e-4, 2.5e-6] on mps).
+    "clip_range": [0.150, 0.025], # [initial, final] of the linear schedule.
+    "total_timesteps": 100000000,
+    "shared_memory_env": False, # SharedMemoryVecEnv instead of SubprocVecEnv.
+    "num_workers": None, # Processes hosting the envs of SharedMemoryVecEnv; None for one per physical core.
+    "pin_cpus": False,
+    "compact_obs": False, # cnn only: 4x12x12 planes with SmallGridCNN.
+    "frame_stack": 1, # At most 3 with compact_obs.
+    "compact_rollout_buffer": False, # cnn only: see compact_rollout_buffer.py.
+    "telemetry": False, # Write telemetry.jsonl next to the models (training_telemetry.py).
+    "save_dir": None # None: trained_models_<policy> (trained_models_cnn_mps for cnn on mps), where the test scripts look.
+}
+LOG_DIR = "logs"
+LOGGED_ONLY = ("hardware", "calibration") # Keys of launch_config.json that are not settings.
+
+CALIBRATION_NUM_ENVS = (8, 16, 32, 64)
+CALIBRATION_BATCH_SIZES = (256, 512, 1024)
+CALIBRATION_STEPS = 128 # n_steps of the calibration runs.
+CALIBRATION_ROLLOUTS = 3 # The first one is warm-up.
+
+def detect_device(requested):
+    available = {"cuda": torch.cuda.is_available(), "mps": torch.backends.mps.is_available(), "cpu": True}
+    if requested == "auto":
+        return next(device for device in ("cuda", "mps", "cpu") if available[device])
+    if not available[requested]:
+        print(f"{requested} is not available, training on the CPU.")
+        return "cpu"
+    return requested
+
+def make_vec_env(config, num_envs):
+    # Generate a list of random seeds for each environment.
+    seed_set = set()
+    while len(seed_set) < num_envs:
+        seed_set.add(random.randint(0, 1e9))
+    env_fns = [make_env(config["policy"], seed=s, compact=config["compact_obs"], frame_stack=config["frame_stack"]) for s in seed_set]
+    if config["shared_memory_env"]:
+        return SharedMemoryVecEnv(env_fns, num_workers=config["num_workers"], pin_cpus=config["pin_cpus"])
+    return SubprocVecEnv(env_fns)
+
+def make_model(config, env, device, n_steps, batch_size, learning_rate, clip_range, **kwargs):
+    policy_kwargs = dict(features_extractor_class=SmallGridCNN) if config["policy"] == "cnn" and config["compact_obs"] else None
+    model = MaskablePPO(
+        "CnnPolicy" if config["policy"] == "cnn" else "MlpPolicy",
+        env,
+        device=device,
+        n_steps=n_steps,
+        batch_size=batch_size,
+        n_epochs=config["n_epochs"],
+        gamma=config["gamma"],
+        learning_rate=learning_rate,
+        clip_range=clip_range,
+        policy_kwargs=policy_kwargs,
+        **kwargs
+    )
+    if config["policy"] == "cnn" and config["compact_rollout_buffer"]:
+        use_compact_rollout_buffer(model, cell_size=1 if config["compact_obs"] else 7)
+    return model
+
+# Seconds per sample of every candidate. Every (num_envs, torch_threads) pair runs a few short rollouts, and every
+# batch size is then timed with model.train() on the last of them: the update cost per sample depends on the env
+# count as well, through the number of minibatches in a rollout. A setting costs its rollout time plus its update time.
+def calibrate(config, device):
+    cores = len(physical_cores())
+    candidates = {
+        "num_envs": CALIBRATION_NUM_ENVS,
+        "batch_size": CALIBRATION_BATCH_SIZES,
+        "torch_threads": sorted({1, max(1, cores // 2), cores})
+    }
+    for key in candidates:
+        if config[key] is not None:
+            candidates[key] = (config[key],)
+
+    results = []
+    for threads in candidates["torch_threads"]:
+        torch.set_num_threads(threads)
+        for num_envs in sorted(candidates["num_envs"]):
+            env = make_vec_env(config, num_envs)
+            model = make_model(config, env, device, CALIBRATION_STEPS, min(candidates["batch_size"]), 2.5e-4, 0.15)
+            timer = PhaseTimer()
+            samples = CALIBRATION_STEPS * num_envs
+            model.learn(total_timesteps=CALIBRATION_ROLLOUTS * samples, callback=timer)
+            rollout = min(timer.rollout_times[1:]) / samples
+            print(f"threads {threads:>3}, {num_envs:>3} envs: rollout {rollout * 1e6:.0f} us/sample")
+            for batch_size in candidates["batch_size"]:
+                model.batch_size = batch_size
+                start = time.perf_counter()
+                model.train()
+                update = (time.perf_counter() - start) / samples
+                print(f"threads {threads:>3}, {num_envs:>3} envs, batch {batch_size:>5}: update {update * 1e6:.0f} us/sample")
+                results.append({"num_envs": num_envs, "batch_size": batch_size, "torch_threads": threads,
+                                "rollout_s_per_sample": rollout, "update_s_per_sample": update, "s_per_sample": rollout + update})
+            env.close()
+
+    results.sort(key=lambda result: result["s_per_sample"])
+    return results
+
+def load_config(argv):
+    parser = argparse.ArgumentParser(description="Train a MaskablePPO Snake agent.")
+    parser.add_argument("--config", help="JSON file with any of the DEFAULT_CONFIG settings.")
+    parser.add_argument("--policy", choices=["cnn", "mlp"])
+    parser.add_argument("--device", choices=["auto", "cpu", "cuda", "mps"])
+    parser.add_argument("--num-envs", dest="num_envs", type=int)
+    parser.add_argument("--batch-size", dest="batch_size", type=int)
+    parser.add_argument("--torch-threads", dest="torch_threads", type=int)
+    parser.add_argument("--n-steps", dest="n_steps", type=int)
+    parser.add_argument("--total-timesteps", dest="total_timesteps", type=int)
+    parser.add_argument("--save-dir", dest="save_dir")
+    parser.add_argument("--calibrate", dest="calibrate", action="store_true", default=None)
+    parser.add_argument("--no-calibrate", dest="calibrate", action="store_false", default=None)
+    args = parser.parse_args(argv)
+
+    config = dict(DEFAULT_CONFIG)
+    if args.config:
+        with open(args.config) as f:
+            settings = json.load(f)
+        for key in LOGGED_ONLY: # launch_config.json of an earlier run.
+            settings.pop(key, None)
+        unknown = set(settings) - set(config)
+        if unknown:
+            raise ValueError(f"Unknown settings in {args.config}: {', '.join(sorted(unknown))}")
+        config.update(settings)
+    config.update({key: value for key, value in vars(args).items() if key != "config" and value is not None})
+    return config
+
+def main(argv=None):
+    config = load_config(argv)
+    device = detect_device(config["device"])
+    config["device"] = device
+    mps = device == "mps"
+
+    calibration = None
+    unset = [key for key in ("num_envs", "batch_size", "torch_threads") if config[key] is None]
+    if unset and (config["calibrate"] if config["calibrate"] is not None else device == "cpu"):
+        calibration = calibrate(config, device)
+        for key in unset:
+            config[key] = calibration[0][key]
+    if config["num_envs"] is None:
+        config["num_envs"] = 32 * 2 if mps else 32
+    if config["batch_size"] is None:
+        config["batch_size"] = 512 * 8 if mps else 512
+    if config["torch_threads"] is None:
+        config["torch_threads"] = torch.get_num_threads()
+    if config["learning_rate"] is None:
+        config["learning_rate"] = [5e-4, 2.5e-6] if mps else [2.5e-4, 2.5e-6]
+    if config["save_dir"] is None:
+        config["save_dir"] = f"trained_models_{config['policy']}" + ("_mps" if mps and config["policy"] == "cnn" else "")
+    torch.set_num_threads(config["torch_threads"])
+
+    # Log what is about to run, so that the run can be repeated with --config <save_dir>/launch_config.json.
+    save_dir = config["save_dir"]
+    os.makedirs(save_dir, exist_ok=True)
+    os.makedirs(LOG_DIR, exist_ok=True)
+    hardware = {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "logical_cpus": os.cpu_count(),
+        "physical_cores": len(physical_cores()),
+        "torch": torch.__version__,
+        "cuda_device": torch.cuda.get_device_name(0) if device == "cuda" else None
+    }
+    with open(os.path.join(save_dir, "launch_config.json"), "w") as f:
+        json.dump(dict(config, hardware=hardware, calibration=calibration), f, indent=4)
+    print(f"Training on {device}: {config['num_envs']} envs, batch {config['batch_size']}, {config['torch_threads']} torch threads")
+
+    env = make_vec_env(config, config["num_envs"])
+    model = make_model(
+        config, env, device, config["n_steps"], config["batch_size"],
+        linear_schedule(*config["learning_rate"]), linear_schedule(*config["clip_range"]),
+        verbose=1, tensorboard_log=LOG_DIR
+    )
+
+    checkpoint_interval = 15625 # checkpoint_interval * num_envs = total_steps_per_checkpoint
+    callbacks = [CheckpointCallback(save_freq=checkpoint_interval, save_path=save_dir, name_prefix="ppo_snake")]
+    if config["telemetry"]:
+        callbacks.append(TelemetryCallback(os.path.join(save_dir, "telemetry.jsonl"), tensorboard=True))
+
+    # Writing the training logs from stdout to a file
+    original_stdout = sys.stdout
+    log_file_path = os.path.join(save_dir, "training_log.txt")
+    with open(log_file_path, 'w') as log_file:
+        sys.stdout = log_file
+
+        model.learn(
+            total_timesteps=int(config["total_timesteps"]),
+            callback=callbacks
+        )
+        env.close()
+
+    # Restore stdout
+    sys.stdout = original_stdout
+
+    # Save the final model
+    model.save(os.path.join(save_dir, "ppo_snake_final.zip"))
+
+if __name__ == "__main__":
+    main()
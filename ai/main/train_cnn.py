@@ -3,60 +3,67 @@ import sys
 import random
 
 import torch
-from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.vec_env import SubprocVecEnv
 from stable_baselines3.common.callbacks import CheckpointCallback
 
 from sb3_contrib import MaskablePPO
-from sb3_contrib.common.wrappers import ActionMasker
 
-from snake_game_custom_wrapper_cnn import SnakeEnv
+from snake_game_vec_env_cnn import SnakeVecEnv
+from snake_game_shm_vec_env import SharedMemoryVecEnv
+from snake_env_pool import SnakeEnvPool
+from async_maskable_ppo import AsyncMaskablePPO
+from training_telemetry import TelemetryCallback
+from training_common import linear_schedule, make_env
+from small_grid_cnn import SmallGridCNN
+from compact_rollout_buffer import use_compact_rollout_buffer
 
 if torch.backends.mps.is_available():
     NUM_ENV = 32 * 2
 else:
     NUM_ENV = 32
 LOG_DIR = "logs"
+IN_PROCESS_ENV = False # Step all environments inside the training process with SnakeVecEnv instead of one subprocess per env.
+SHARED_MEMORY_ENV = False # Pass observations from the env subprocesses through shared memory instead of pickling them.
+NUM_WORKERS = None # Processes hosting the envs of SharedMemoryVecEnv; None for one per physical core.
+PIN_CPUS = False # Bind every env worker process to its own core.
+ASYNC_ENV_POOL = False # Step the envs asynchronously with SnakeEnvPool and collect rollouts with AsyncMaskablePPO.
+POOL_BATCH_SIZE = NUM_ENV // 2 # Envs returned by each SnakeEnvPool.recv().
+COMPACT_OBS = False # Observe the raw 12x12 board as 4 uint8 planes and use SmallGridCNN instead of 84x84x3 images and NatureCNN.
+FRAME_STACK = 1 # Number of most recent frames in each observation (at most 3 with COMPACT_OBS).
+COMPACT_ROLLOUT_BUFFER = False # Keep rollouts as uint8 boards (one pixel per 7x7 image block) and bit-packed masks instead of float32.
+TELEMETRY = False # Write rollout/update timings, env worker step latencies and memory use to telemetry.jsonl next to the models.
 
 os.makedirs(LOG_DIR, exist_ok=True)
 
-# Linear scheduler
-def linear_schedule(initial_value, final_value=0.0):
-
-    if isinstance(initial_value, str):
-        initial_value = float(initial_value)
-        final_value = float(final_value)
-        assert (initial_value > 0.0)
-
-    def scheduler(progress):
-        return final_value + progress * (initial_value - final_value)
-
-    return scheduler
-
-def make_env(seed=0):
-    def _init():
-        env = SnakeEnv(seed=seed)
-        env = ActionMasker(env, SnakeEnv.get_action_mask)
-        env = Monitor(env)
-        env.seed(seed)
-        return env
-    return _init
-
 def main():
 
     # Generate a list of random seeds for each environment.
     seed_set = set()
     while len(seed_set) < NUM_ENV:
         seed_set.add(random.randint(0, 1e9))
+    env_fns = [make_env("cnn", seed=s, compact=COMPACT_OBS, frame_stack=FRAME_STACK) for s in seed_set]
 
     # Create the Snake environment.
-    env = SubprocVecEnv([make_env(seed=s) for s in seed_set])
+    if IN_PROCESS_ENV:
+        env = SnakeVecEnv(NUM_ENV, seed=random.randint(0, 1e9), compact=COMPACT_OBS, frame_stack=FRAME_STACK)
+    elif ASYNC_ENV_POOL:
+        env = SnakeEnvPool(env_fns, batch_size=POOL_BATCH_SIZE, num_workers=NUM_WORKERS, pin_cpus=PIN_CPUS)
+    elif SHARED_MEMORY_ENV:
+        env = SharedMemoryVecEnv(env_fns, num_workers=NUM_WORKERS, pin_cpus=PIN_CPUS)
+    else:
+        env = SubprocVecEnv(env_fns)
+    ppo_class = AsyncMaskablePPO if ASYNC_ENV_POOL else MaskablePPO
+
+    if COMPACT_OBS:
+        policy_kwargs = dict(features_extractor_class=SmallGridCNN)
+    else:
+        policy_kwargs = None # Default NatureCNN.
 
     if torch.backends.mps.is_available():
         lr_schedule = linear_schedule(5e-4, 2.5e-6)
         clip_range_schedule = linear_schedule(0.150, 0.025)
         # Instantiate a PPO agent using MPS (Metal Performance Shaders).
-        model = MaskablePPO(
+        model = ppo_class(
             "CnnPolicy",
             env,
             device="mps",
@@ -67,13 +74,14 @@ def main():
             gamma=0.94,
             learning_rate=lr_schedule,
             clip_range=clip_range_schedule,
-            tensorboard_log=LOG_DIR
+            tensorboard_log=LOG_DIR,
+            policy_kwargs=policy_kwargs
         )
     else:
         lr_schedule = linear_schedule(2.5e-4, 2.5e-6)
         clip_range_schedule = linear_schedule(0.150, 0.025)
         # Instantiate a PPO agent using CUDA.
-        model = MaskablePPO(
+        model = ppo_class(
             "CnnPolicy",
             env,
             device="cuda",
@@ -84,9 +92,13 @@ def main():
             gamma=0.94,
             learning_rate=lr_schedule,
             clip_range=clip_range_schedule,
-            tensorboard_log=LOG_DIR
+            tensorboard_log=LOG_DIR,
+            policy_kwargs=policy_kwargs
         )
 
+    if COMPACT_ROLLOUT_BUFFER:
+        use_compact_rollout_buffer(model, cell_size=1 if COMPACT_OBS else 7)
+
     # Set the save directory
     if torch.backends.mps.is_available():
         save_dir = "trained_models_cnn_mps"
@@ -95,7 +107,12 @@ def main():
     os.makedirs(save_dir, exist_ok=True)
 
     checkpoint_interval = 15625 # checkpoint_interval * num_envs = total_steps_per_checkpoint
+    if ASYNC_ENV_POOL: # Callbacks run once per recv() batch instead of once per step of all envs.
+        checkpoint_interval = checkpoint_interval * NUM_ENV // POOL_BATCH_SIZE
     checkpoint_callback = CheckpointCallback(save_freq=checkpoint_interval, save_path=save_dir, name_prefix="ppo_snake")
+    callbacks = [checkpoint_callback]
+    if TELEMETRY:
+        callbacks.append(TelemetryCallback(os.path.join(save_dir, "telemetry.jsonl"), tensorboard=True))
 
     # Writing the training logs from stdout to a file
     original_stdout = sys.stdout
@@ -105,7 +122,7 @@ def main():
 
         model.learn(
             total_timesteps=int(100000000),
-            callback=[checkpoint_callback]
+            callback=callbacks
         )
         env.close()
 
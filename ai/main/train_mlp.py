@@ -2,55 +2,49 @@ import os
 import sys
 import random
 
-from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.vec_env import SubprocVecEnv
 from stable_baselines3.common.callbacks import CheckpointCallback
 from sb3_contrib import MaskablePPO
-from sb3_contrib.common.wrappers import ActionMasker
 
-from snake_game_custom_wrapper_mlp import SnakeEnv
+from snake_game_shm_vec_env import SharedMemoryVecEnv
+from snake_env_pool import SnakeEnvPool
+from async_maskable_ppo import AsyncMaskablePPO
+from training_telemetry import TelemetryCallback
+from training_common import linear_schedule, make_env
 
 NUM_ENV = 32
 LOG_DIR = "logs"
+SHARED_MEMORY_ENV = False # Pass observations from the env subprocesses through shared memory instead of pickling them.
+NUM_WORKERS = None # Processes hosting the envs of SharedMemoryVecEnv; None for one per physical core.
+PIN_CPUS = False # Bind every env worker process to its own core.
+ASYNC_ENV_POOL = False # Step the envs asynchronously with SnakeEnvPool and collect rollouts with AsyncMaskablePPO.
+POOL_BATCH_SIZE = NUM_ENV // 2 # Envs returned by each SnakeEnvPool.recv().
+FRAME_STACK = 1 # Number of most recent boards in each observation.
+TELEMETRY = False # Write rollout/update timings, env worker step latencies and memory use to telemetry.jsonl next to the models.
 os.makedirs(LOG_DIR, exist_ok=True)
 
-# Linear scheduler
-def linear_schedule(initial_value, final_value=0.0):
-
-    if isinstance(initial_value, str):
-        initial_value = float(initial_value)
-        final_value = float(final_value)
-        assert (initial_value > 0.0)
-
-    def scheduler(progress):
-        return final_value + progress * (initial_value - final_value)
-
-    return scheduler
-
-def make_env(seed=0):
-    def _init():
-        env = SnakeEnv(seed=seed)
-        env = ActionMasker(env, SnakeEnv.get_action_mask)
-        env = Monitor(env)
-        env.seed(seed)
-        return env
-    return _init
-
 def main():
 
     # Generate a list of random seeds for each environment.
     seed_set = set()
     while len(seed_set) < NUM_ENV:
         seed_set.add(random.randint(0, 1e9))
+    env_fns = [make_env("mlp", seed=s, frame_stack=FRAME_STACK) for s in seed_set]
 
     # Create the Snake environment.
-    env = SubprocVecEnv([make_env(seed=s) for s in seed_set])
+    if ASYNC_ENV_POOL:
+        env = SnakeEnvPool(env_fns, batch_size=POOL_BATCH_SIZE, num_workers=NUM_WORKERS, pin_cpus=PIN_CPUS)
+    elif SHARED_MEMORY_ENV:
+        env = SharedMemoryVecEnv(env_fns, num_workers=NUM_WORKERS, pin_cpus=PIN_CPUS)
+    else:
+        env = SubprocVecEnv(env_fns)
+    ppo_class = AsyncMaskablePPO if ASYNC_ENV_POOL else MaskablePPO
 
     lr_schedule = linear_schedule(2.5e-4, 2.5e-6)
     clip_range_schedule = linear_schedule(0.15, 0.025)
 
     # # Instantiate a PPO agent
-    model = MaskablePPO(
+    model = ppo_class(
         "MlpPolicy",
         env,
         device="cuda",
@@ -69,7 +63,12 @@ def main():
     os.makedirs(save_dir, exist_ok=True)
 
     checkpoint_interval = 15625 # checkpoint_interval * num_envs = total_steps_per_checkpoint
+    if ASYNC_ENV_POOL: # Callbacks run once per recv() batch instead of once per step of all envs.
+        checkpoint_interval = checkpoint_interval * NUM_ENV // POOL_BATCH_SIZE
     checkpoint_callback = CheckpointCallback(save_freq=checkpoint_interval, save_path=save_dir, name_prefix="ppo_snake")
+    callbacks = [checkpoint_callback]
+    if TELEMETRY:
+        callbacks.append(TelemetryCallback(os.path.join(save_dir, "telemetry.jsonl"), tensorboard=True))
 
     # Writing the training logs from stdout to a file
     original_stdout = sys.stdout
@@ -79,7 +78,7 @@ def main():
 
         model.learn(
             total_timesteps=int(100000000),
-            callback=[checkpoint_callback]
+            callback=callbacks
         )
         env.close()
 
@@ -0,0 +1,34 @@
+from stable_baselines3.common.monitor import Monitor
+from sb3_contrib.common.wrappers import ActionMasker
+
+from snake_game_custom_wrapper_cnn import SnakeEnv as CnnSnakeEnv
+from snake_game_custom_wrapper_mlp import SnakeEnv as MlpSnakeEnv
+
+# Helpers shared by train_cnn.py, train_mlp.py and train.py.
+
+# Linear scheduler
+def linear_schedule(initial_value, final_value=0.0):
+
+    if isinstance(initial_value, str):
+        initial_value = float(initial_value)
+        final_value = float(final_value)
+        assert (initial_value > 0.0)
+
+    def scheduler(progress):
+        return final_value + progress * (initial_value - final_value)
+
+    return scheduler
+
+# Env factory for the vec envs: a masked, monitored SnakeEnv of the "cnn" or "mlp" policy (compact is cnn only).
+def make_env(policy, seed=0, compact=False, frame_stack=1):
+    def _init():
+        if policy == "cnn":
+            env = CnnSnakeEnv(seed=seed, compact=compact, frame_stack=frame_stack)
+            env = ActionMasker(env, CnnSnakeEnv.get_action_mask)
+        else:
+            env = MlpSnakeEnv(seed=seed, frame_stack=frame_stack)
+            env = ActionMasker(env, MlpSnakeEnv.get_action_mask)
+        env = Monitor(env)
+        env.seed(seed)
+        return env
+    return _init
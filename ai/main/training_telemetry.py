@@ -0,0 +1,192 @@
+import os
+import json
+import time
+
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+from snake_game_shm_vec_env import SharedMemoryVecEnv
+from snake_env_pool import SnakeEnvPool
+from async_maskable_ppo import unwrap_vec_env
+
+# Where the time of a PPO run goes. Writes one JSON line per rollout and the update that follows it:
+#     rollout, timesteps, time_s          index, timesteps so far and seconds since the start of learn()
+#     steps_per_s, rollout_steps_per_s   env steps per second over rollout + update, and over the rollout alone
+#     rollout_s, update_s                seconds collecting the rollout and running the gradient update
+#     env_step_s, non_env_s              rollout time spent waiting in env.step (SnakeEnvPool.send/recv with
+#                                        AsyncMaskablePPO), and the rest of it, untimed in detail: policy forward
+#                                        passes, buffer writes, callbacks including this one
+#     rss_mb, workers_rss_mb             resident memory of the training process and of all env worker processes
+# With a SharedMemoryVecEnv or SnakeEnvPool also worker_step_ms (p50/p90/p99/max of the time each env step took,
+# per worker) and worker_step_hist (per worker, counts of env steps in the LATENCY_BIN_EDGES_MS bins; the edges are
+# in the first line). With tensorboard=True the scalars also go to the model's logger under "telemetry/".
+# Per step it costs two perf_counter calls and a copy of num_envs floats; everything else runs once per rollout.
+LATENCY_BIN_EDGES_MS = np.concatenate(([0.0], np.geomspace(0.01, 1000, 21))) # 10 us to 1 s, 4 bins per decade.
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Resident memory of a process in bytes, from /proc/<pid>/statm (None where there is no /proc).
+def rss_bytes(pid="self"):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return None
+
+# Wall time of every rollout and of the update that follows it, for the calibration in train.py and the benchmarks.
+class PhaseTimer(BaseCallback):
+    def __init__(self):
+        super().__init__()
+        self.rollout_times = []
+        self.update_times = []
+        self._start = None
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self._start is not None: # Time since the end of the previous rollout was spent in the update.
+            self.update_times.append(now - self._start)
+        self._start = now
+
+    def _on_rollout_end(self):
+        now = time.perf_counter()
+        self.rollout_times.append(now - self._start)
+        self._start = now
+
+    def _on_training_end(self):
+        self.update_times.append(time.perf_counter() - self._start)
+
+    def _on_step(self):
+        return True
+
+class TelemetryCallback(BaseCallback):
+    def __init__(self, path, tensorboard=False, verbose=0):
+        super().__init__(verbose)
+        self.path = path
+        self.tensorboard = tensorboard
+        self._file = None
+        self._num_rows = 0
+
+    def _on_training_start(self):
+        self._file = open(self.path, "a")
+        self._training_start = time.perf_counter()
+        self._rollout_start = None
+        self._rollout_end = None
+        self._row = None # Rollout measurements waiting for the update time.
+
+        # Count the time the learner waits for the envs by wrapping the methods it calls on them.
+        self._env_time = 0.0
+        self._wrapped = [(self.training_env, "step")]
+        self._vec_env = unwrap_vec_env(self.training_env)
+        if isinstance(self._vec_env, SnakeEnvPool):
+            self._wrapped += [(self._vec_env, "send"), (self._vec_env, "recv")]
+        for obj, name in self._wrapped:
+            setattr(obj, name, self._timed(getattr(obj, name)))
+
+        if isinstance(self._vec_env, SharedMemoryVecEnv):
+            self._step_times = self._vec_env.step_times()
+            self._worker_of_env = np.array([worker for worker, _ in self._vec_env.env_locations])
+            self._num_workers = len(self._vec_env.remotes)
+            self._all_envs = np.arange(self._vec_env.num_envs)
+        else: # No per-env step times from SubprocVecEnv or SnakeVecEnv.
+            self._step_times = None
+
+    def _timed(self, method):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._env_time += time.perf_counter() - start
+        return timed
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self._row is not None:
+            self._write_row(now - self._rollout_end)
+        self._rollout_start = now
+        self._rollout_timesteps = self.num_timesteps
+        self._env_time = 0.0
+        self._sample_envs = []
+        self._sample_times = []
+
+    def _on_step(self):
+        if self._step_times is not None:
+            env_ids = self.locals.get("env_ids") # The envs of the batch from SnakeEnvPool.recv(); all envs otherwise.
+            if env_ids is None:
+                env_ids = self._all_envs
+                self._sample_times.append(self._step_times.copy())
+            else:
+                self._sample_times.append(self._step_times[env_ids])
+            self._sample_envs.append(env_ids)
+        return True
+
+    def _on_rollout_end(self):
+        now = time.perf_counter()
+        self._rollout_end = now
+        rollout_s = now - self._rollout_start
+        self._row = {
+            "rollout_steps": self.num_timesteps - self._rollout_timesteps,
+            "rollout_s": rollout_s,
+            "env_step_s": self._env_time,
+            "non_env_s": rollout_s - self._env_time
+        }
+        if self._step_times is not None and self._sample_times:
+            self._row.update(self._worker_latencies())
+
+    def _on_training_end(self):
+        if self._row is not None:
+            self._write_row(time.perf_counter() - self._rollout_end)
+        for obj, name in self._wrapped:
+            delattr(obj, name) # Back to the method of the class.
+        self._file.close()
+        self._file = None
+
+    def _worker_latencies(self):
+        step_ms = np.concatenate(self._sample_times) * 1000
+        workers = self._worker_of_env[np.concatenate(self._sample_envs)]
+        percentiles = {"p50": [], "p90": [], "p99": [], "max": []}
+        histograms = []
+        for worker in range(self._num_workers):
+            samples = step_ms[workers == worker]
+            if len(samples) == 0:
+                values = [0.0] * 4
+            else:
+                values = list(np.percentile(samples, [50, 90, 99])) + [samples.max()]
+            for key, value in zip(percentiles, values):
+                percentiles[key].append(round(float(value), 4))
+            counts, _ = np.histogram(np.minimum(samples, LATENCY_BIN_EDGES_MS[-1]), LATENCY_BIN_EDGES_MS)
+            histograms.append(counts.tolist())
+        return {"worker_step_ms": percentiles, "worker_step_hist": histograms}
+
+    def _write_row(self, update_s):
+        row = self._row
+        self._row = None
+        rollout_s = row["rollout_s"]
+        rollout_steps = row["rollout_steps"]
+        workers_rss = [rss_bytes(process.pid) for process in getattr(self._vec_env, "processes", [])]
+        scalars = {
+            "rollout": self._num_rows,
+            "timesteps": self.num_timesteps,
+            "time_s": time.perf_counter() - self._training_start,
+            "steps_per_s": rollout_steps / (rollout_s + update_s),
+            "rollout_steps_per_s": rollout_steps / rollout_s,
+            "rollout_s": rollout_s,
+            "update_s": update_s,
+            "env_step_s": row["env_step_s"],
+            "non_env_s": row["non_env_s"],
+            "rss_mb": (rss_bytes() or 0) / 2 ** 20,
+            "workers_rss_mb": sum(rss or 0 for rss in workers_rss) / 2 ** 20
+        }
+        row = {key: value for key, value in row.items() if key.startswith("worker_")}
+        line = dict(scalars, **row)
+        if self._num_rows == 0 and "worker_step_hist" in row:
+            line["latency_bin_edges_ms"] = LATENCY_BIN_EDGES_MS.tolist()
+        self._file.write(json.dumps(line) + "\n")
+        self._file.flush()
+        self._num_rows += 1
+
+        if self.tensorboard:
+            for key, value in scalars.items():
+                if key != "rollout":
+                    self.logger.record(f"telemetry/{key}", value)
+            if "worker_step_ms" in row: # The slowest worker, where stragglers show up.
+                self.logger.record("telemetry/worker_step_p99_ms_max", max(row["worker_step_ms"]["p99"]))
@@ -0,0 +1,36 @@
+from collections import OrderedDict
+
+# Bounded LRU cache keyed on position hashes (SnakeGame.zobrist_hash or SnakeGame.state_key()), shared by planners
+# and evaluators to avoid searching or scoring the same position twice.
+class TranspositionTable:
+    def __init__(self, max_entries=1000000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        value = self.entries.get(key, self)
+        if value is self:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False) # Evict the least recently used entry.
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
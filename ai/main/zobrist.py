@@ -0,0 +1,56 @@
+import random
+import functools
+
+# Zobrist hashing of Snake positions: one random 64-bit key per (body cell), (head cell), (food cell) and direction.
+# The hash of a position is the XOR of the keys of its parts, so SnakeGame can update it with a few XORs per move
+# instead of re-hashing the whole body.
+class ZobristKeys:
+    def __init__(self, board_size, seed=0):
+        rng = random.Random(seed)
+        grid_size = board_size ** 2
+        self.body = [rng.getrandbits(64) for _ in range(grid_size)]
+        self.head = [rng.getrandbits(64) for _ in range(grid_size)]
+        self.food = [rng.getrandbits(64) for _ in range(grid_size)]
+        self.direction = [rng.getrandbits(64) for _ in range(4)] # Indexed by action code 0: UP, 1: LEFT, 2: RIGHT, 3: DOWN.
+
+    # Hash from scratch; body_cells, head and food are flat cell indices.
+    def hash(self, body_cells, head, food, direction):
+        value = self.head[head] ^ self.food[food] ^ self.direction[direction]
+        for cell in body_cells:
+            value ^= self.body[cell]
+        return value
+
+# Keys are shared by every game of the same board size, so hashes are comparable across games and processes.
+@functools.lru_cache(maxsize=None)
+def zobrist_keys(board_size):
+    return ZobristKeys(board_size)
+
+# Collision-rate check: play random games, map every distinct position (occupied cells, head, food, direction) to its
+# hash and count hashes shared by different positions. With 64-bit keys the expected number of collisions among
+# n positions is about n^2 / 2^65, i.e. far below one for the few million positions visited here, so any collision
+# reported means the incremental update is wrong rather than bad luck.
+if __name__ == "__main__":
+    import sys
+    from snake_game import SnakeGame
+
+    NUM_STEPS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    seen = {}
+    collisions = 0
+    for board_size in (6, 12):
+        game = SnakeGame(seed=0, board_size=board_size, zobrist=True)
+        rng = random.Random(0)
+        for _ in range(NUM_STEPS // 2):
+            mask = game.get_action_mask()
+            actions = [a for a in range(4) if mask[a]]
+            done, _ = game.step(rng.choice(actions) if actions else 0)
+            if done:
+                game.reset()
+            position = (board_size, bytes(game.occupancy), game.body[0], game.food, game.direction)
+            other = seen.setdefault(game.zobrist_hash, position)
+            if other != position:
+                collisions += 1
+            assert game.zobrist_hash == game.compute_zobrist_hash()
+
+    expected = len(seen) ** 2 / 2 ** 65
+    print(f"Distinct hashes: {len(seen)}, collisions: {collisions}, expected by chance: {expected:.2e}")
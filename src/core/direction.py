@@ -0,0 +1,25 @@
+"""
+direction.py
+
+This module defines the snake's movement directions as int codes with
+precomputed lookup tables (movement delta, opposite direction and image names),
+so that the snake's hot paths use tuple lookups instead of string if/elif chains.
+The codes match the action encoding of the AI environments in ai/main.
+"""
+
+from typing import Tuple
+
+UP, LEFT, RIGHT, DOWN = 0, 1, 2, 3
+
+# שמות הכיוונים לפי הקוד
+NAMES: Tuple[str, ...] = ("UP", "LEFT", "RIGHT", "DOWN")
+
+# תזוזה (dx, dy) בכל כיוון, ביחידות של בלוק
+DELTAS: Tuple[Tuple[int, int], ...] = ((0, -1), (-1, 0), (1, 0), (0, 1))
+
+# הכיוון ההפוך לכל כיוון (3 - direction)
+OPPOSITE: Tuple[int, ...] = (DOWN, RIGHT, LEFT, UP)
+
+# שמות התמונות של הראש והזנב לפי הכיוון
+HEAD_IMAGES: Tuple[str, ...] = ("head_up", "head_left", "head_right", "head_down")
+TAIL_IMAGES: Tuple[str, ...] = ("tail_up", "tail_left", "tail_right", "tail_down")
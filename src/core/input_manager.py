@@ -2,6 +2,7 @@
 import pygame
 from typing import List
 from src.core.snake import Snake
+from src.core.direction import UP, LEFT, RIGHT, DOWN
 from src.audio.sound_manager import SoundManager
 import config.settings as settings
 
@@ -21,15 +22,15 @@ class InputManager:
                 # שאר אירועי מקלדת עבור ניהול תנועת הנחש
                 if self.snake:
                     if event.key == pygame.K_UP:
-                        self.snake.change_direction("UP")
+                        self.snake.change_direction(UP)
                         self.sound_manager.play_sound("SOUND_MOVE")
                     elif event.key == pygame.K_DOWN:
-                        self.snake.change_direction("DOWN")
+                        self.snake.change_direction(DOWN)
                         self.sound_manager.play_sound("SOUND_MOVE")
                     elif event.key == pygame.K_LEFT:
-                        self.snake.change_direction("LEFT")
+                        self.snake.change_direction(LEFT)
                         self.sound_manager.play_sound("SOUND_MOVE")
                     elif event.key == pygame.K_RIGHT:
-                        self.snake.change_direction("RIGHT")
+                        self.snake.change_direction(RIGHT)
                         self.sound_manager.play_sound("SOUND_MOVE")
         return True
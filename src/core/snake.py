@@ -11,6 +11,7 @@ import pygame
 from typing import List, Tuple
 
 import config.settings as settings
+from src.core.direction import UP, LEFT, RIGHT, DOWN, DELTAS, OPPOSITE, HEAD_IMAGES, TAIL_IMAGES
 
 class Snake:
     """
@@ -37,8 +38,8 @@ class Snake:
         if initial_position is None:
             initial_position = (settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 2)
 
-        # כיוון התחלתי - נניח לימין
-        self.direction: str = "RIGHT"
+        # כיוון התחלתי - נניח לימין (קודי הכיוונים מוגדרים ב-direction.py)
+        self.direction: int = RIGHT
 
         # יצירת גוף הנחש – ראש ראשון במיקום ההתחלתי
         self.body: List[Tuple[int, int]] = [initial_position]
@@ -56,30 +57,21 @@ class Snake:
             img = pygame.transform.scale(img, (self.block_size, self.block_size))
             self.images[key] = img
 
-    def change_direction(self, new_direction: str) -> None:
+    def change_direction(self, new_direction: int) -> None:
         """
         משנה את כיוון תנועת הנחש, תוך מניעת שינוי ישיר לכיוון ההפוך.
         
-        :param new_direction: הכיוון החדש כ-string ("UP", "DOWN", "LEFT", "RIGHT").
+        :param new_direction: הכיוון החדש כקוד (UP, LEFT, RIGHT, DOWN מ-direction.py).
         """
-        opposites = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
-        if new_direction == opposites.get(self.direction):
+        if new_direction == OPPOSITE[self.direction]:
             # אין אפשרות לעבור לכיוון ההפוך ישירות.
             return
         self.direction = new_direction
 
     def update(self) -> None:
         head_x, head_y = self.body[0]
-        if self.direction == "UP":
-            new_head = (head_x, head_y - self.block_size)
-        elif self.direction == "DOWN":
-            new_head = (head_x, head_y + self.block_size)
-        elif self.direction == "LEFT":
-            new_head = (head_x - self.block_size, head_y)
-        elif self.direction == "RIGHT":
-            new_head = (head_x + self.block_size, head_y)
-        else:
-            new_head = (head_x, head_y)
+        dx, dy = DELTAS[self.direction]
+        new_head = (head_x + dx * self.block_size, head_y + dy * self.block_size)
         
         self.body.insert(0, new_head)
         self.body.pop()
@@ -120,28 +112,14 @@ class Snake:
         """
         מחזירה את שם התמונה של הראש לפי הכיוון הנוכחי.
         """
-        if self.direction == "UP":
-            return "head_up"
-        elif self.direction == "DOWN":
-            return "head_down"
-        elif self.direction == "LEFT":
-            return "head_left"
-        else:  # RIGHT
-            return "head_right"
+        return HEAD_IMAGES[self.direction]
 
-    def get_tail_image_name(self, tail_dir: str) -> str:
+    def get_tail_image_name(self, tail_dir: int) -> str:
         """
         מחזירה את שם התמונה של הזנב לפי כיוון התנועה של הזנב.
         כרגע נשתמש בכיוון האחרון הידוע, או נחשב אותו.
         """
-        if tail_dir == "UP":
-            return "tail_up"
-        elif tail_dir == "DOWN":
-            return "tail_down"
-        elif tail_dir == "LEFT":
-            return "tail_left"
-        else:  # RIGHT
-            return "tail_right"
+        return TAIL_IMAGES[tail_dir]
 
     def get_body_image_name(self, prev_pos: Tuple[int, int], curr_pos: Tuple[int, int], next_pos: Tuple[int, int]) -> str:
         """
@@ -193,11 +171,11 @@ class Snake:
         if len(self.body) >= 2:
             before_tail_x, before_tail_y = self.body[-2]
             if tail_x == before_tail_x:
-                tail_dir = "UP" if tail_y < before_tail_y else "DOWN"
+                tail_dir = UP if tail_y < before_tail_y else DOWN
             else:
-                tail_dir = "LEFT" if tail_x < before_tail_x else "RIGHT"
+                tail_dir = LEFT if tail_x < before_tail_x else RIGHT
         else:
-            tail_dir = "RIGHT"  # ברירת מחדל
+            tail_dir = RIGHT  # ברירת מחדל
         
         tail_img_name = self.get_tail_image_name(tail_dir)
         tail_img = self.images[tail_img_name]